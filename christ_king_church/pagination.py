@@ -0,0 +1,112 @@
+import json
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+
+
+def _ordering_fields(model, ordering):
+    fields = []
+    for name in ordering:
+        name = name.lstrip('-')
+        fields.append(model._meta.pk if name == 'pk' else model._meta.get_field(name))
+    return fields
+
+
+def encode_cursor(row, fields):
+    """Opaque cursor for a row's position on the ordering `fields` (model instance or values() dict)"""
+    values = [row[field.attname] if isinstance(row, dict) else getattr(row, field.attname) for field in fields]
+    values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+    return urlsafe_base64_encode(json.dumps(values, default=str).encode())
+
+
+def decode_cursor(cursor, fields):
+    """Return the ordering field values of a cursor, or None if it is malformed"""
+    try:
+        values = json.loads(urlsafe_base64_decode(cursor).decode())
+        if not isinstance(values, list) or len(values) != len(fields):
+            return None
+        return [field.to_python(value) for field, value in zip(fields, values)]
+    except (ValueError, TypeError, UnicodeDecodeError, ValidationError):
+        return None
+
+
+def _seek(ordering, values, backwards=False):
+    # Rows past `values` in `ordering`: (a > x) OR (a = x AND b > y) OR ...
+    condition = Q()
+    for i, name in enumerate(ordering):
+        descending = name.startswith('-') != backwards
+        equal = {previous.lstrip('-'): value for previous, value in zip(ordering[:i], values[:i])}
+        condition |= Q(**equal, **{f"{name.lstrip('-')}__{'lt' if descending else 'gt'}": values[i]})
+    return condition
+
+
+def _reverse(ordering):
+    return [name[1:] if name.startswith('-') else f'-{name}' for name in ordering]
+
+
+class KeysetPage:
+    """
+    One page of a keyset-paginated queryset. Unlike a Django Page it has no
+    number or total; it only knows how to reach its neighbours.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def keyset_paginate(queryset, per_page, ordering, after=None, before=None):
+    """
+    Page through `queryset` in `ordering` (e.g. ('-date', '-pk')), seeking
+    from a cursor with a range condition on those fields instead of an
+    OFFSET, so every page costs the same however deep it is. The ordering
+    must end in a unique field and be backed by an index to stay cheap.
+    Works on model and values() querysets alike.
+
+    `after` continues past the given cursor, `before` returns the page
+    preceding it.
+    """
+    fields = _ordering_fields(queryset.model, ordering)
+    after = decode_cursor(after, fields) if after else None
+    before = decode_cursor(before, fields) if before else None
+
+    if before:
+        rows = list(
+            queryset.filter(_seek(ordering, before, backwards=True))
+            .order_by(*_reverse(ordering))[:per_page + 1]
+        )
+        has_more = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(rows[-1], fields) if rows else None,
+            previous_cursor=encode_cursor(rows[0], fields) if rows and has_more else None,
+        )
+
+    if after:
+        queryset = queryset.filter(_seek(ordering, after))
+
+    rows = list(queryset.order_by(*ordering)[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1], fields) if rows and has_more else None,
+        previous_cursor=encode_cursor(rows[0], fields) if rows and after else None,
+    )
@@ -13,7 +13,6 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 from dotenv import load_dotenv,find_dotenv
-import africastalking
 import dj_database_url
 from django.contrib import messages
 
@@ -129,6 +128,30 @@ DATABASES = {
 
 
 
+# Cache
+# Shared by the web, worker and notifications processes, so an invalidation
+# made in one (e.g. a member save) is seen by all. The table is created by
+# member migration 0008, so every deploy's `manage.py migrate` provides it.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    }
+}
+
+# Seconds a resolved notification recipient list stays cached
+RECIPIENTS_CACHE_TIMEOUT = 300
+
+# Seconds a member autocomplete result stays cached (member edits invalidate it)
+MEMBER_AUTOCOMPLETE_CACHE_TIMEOUT = 30
+
+# Seconds the member list status counters stay cached (member edits invalidate them)
+MEMBER_STATUS_COUNTS_CACHE_TIMEOUT = 60
+
+# Seconds a rendered receipt document stays cached (edits invalidate it)
+RECEIPT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -199,19 +222,43 @@ SEND_SMS_ENABLED = True
 AFRICASTALKING_USERNAME = os.getenv('AFRICASTALKING_USERNAME')  
 AFRICASTALKING_API_KEY = os.getenv('AFRICASTALKING_API_KEY')
 
-africastalking.initialize(AFRICASTALKING_USERNAME, AFRICASTALKING_API_KEY)
-sms = africastalking.SMS
+# SMS gateway HTTP: one pooled keep-alive session per provider account
+SMS_HTTP_TIMEOUT = (5, 30)  # (connect, read) seconds
+SMS_HTTP_RETRIES = 2  # connection errors and 429/503 responses only
+SMS_HTTP_POOL_SIZE = None  # defaults to SMS_MAX_IN_FLIGHT
+
+# Concurrent SMS dispatch: open requests per batch and requests/second per provider
+SMS_MAX_IN_FLIGHT = 4
+SMS_RATE_LIMITS = {
+    'africastalking': 10,
+    'nextsms': 5,
+    'beemafrica': 5,
+}
+
+# Outbound SMS queue (drained by `python manage.py process_sms_queue --loop`)
+SMS_QUEUE_BATCH_SIZE = 50
+SMS_QUEUE_MAX_ATTEMPTS = 5
+SMS_QUEUE_RETRY_BACKOFF = 60  # seconds, doubled on every failed attempt
+SMS_QUEUE_MAX_BACKOFF = 3600
+
+# Notification broadcasts: recipients per provider bulk request
+NOTIFICATION_SMS_BULK = True
+NOTIFICATION_SMS_CHUNK_SIZE = 100
+NOTIFICATION_LOG_BATCH_SIZE = 500  # logs per bulk INSERT / progress flush
 
-"""# Or NextSMS Configuration
-NEXTSMS_API_KEY = 'your_nextsms_api_key'
-NEXTSMS_API_SECRET = 'your_nextsms_api_secret'
-NEXTSMS_SENDER_ID = 'your_sender_id'"""
+# Tithe payment list paging: 'keyset' (cursor on date, id) or 'offset'
+TITHE_LIST_PAGINATION = 'keyset'
 
-"""#Beem africa configuration
+# NextSMS Configuration
+NEXTSMS_API_KEY = os.getenv('NEXTSMS_API_KEY')
+NEXTSMS_API_SECRET = os.getenv('NEXTSMS_API_SECRET')
+NEXTSMS_SENDER_ID = os.getenv('NEXTSMS_SENDER_ID')
+
+#Beem africa configuration
 BEEM_API_KEY = os.getenv('BEEM_API_KEY')
 BEEM_SECRET_KEY = os.getenv('BEEM_SECRET_KEY')
-BEEM_SENDER_NAME = os.getenv('BEEM_SENDER_NAME')    
-"""
-"""# Choose which provider to use
-SMS_PROVIDER = 'africastalking'  # Change to 'nextsms' when ready
-SEND_SMS_ENABLED = True"""
+BEEM_SENDER_NAME = os.getenv('BEEM_SENDER_NAME')
+
+# SMS providers tried in order; recipients that fail on one are retried on
+# the next. Available: 'africastalking', 'nextsms', 'beemafrica'
+SMS_PROVIDERS = ['africastalking']
@@ -0,0 +1,52 @@
+def _flag(value):
+    if value in ('on', '1', 'true', 'True'):
+        return True
+    if value in ('off', '0', 'false', 'False'):
+        return False
+    return None
+
+
+def _id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# Query parameter -> (Member field, parser). Every filter is an equality on
+# a boolean flag or a foreign key id, so the whole set becomes one WHERE
+# clause over member_member with no joins
+MEMBER_FILTERS = {
+    'pays_tithe': ('pays_tithe', _flag),
+    'new_believer_school': ('new_believer_school', _flag),
+    'working': ('working', _flag),
+    'schooling': ('schooling', _flag),
+    'shepherd': ('shepherd_id', _id),
+    'community': ('shepherd_id', _id),
+    'ministry': ('ministry_id', _id),
+}
+
+
+def member_filter_lookups(params):
+    """
+    Field lookups for the MEMBER_FILTERS present in `params` (a QueryDict
+    or dict). Unknown parameters and unparseable values are ignored.
+    """
+    lookups = {}
+    for param, (field, parse) in MEMBER_FILTERS.items():
+        value = parse(params.get(param))
+        if value is not None:
+            lookups[field] = value
+    return lookups
+
+
+def filter_members(queryset, params):
+    """
+    Apply the MEMBER_FILTERS in `params` to a Member queryset in a single
+    filter() call.
+
+    Returns:
+        tuple: (filtered queryset, the lookups applied)
+    """
+    lookups = member_filter_lookups(params)
+    return queryset.filter(**lookups), lookups
@@ -0,0 +1,103 @@
+import hashlib
+import logging
+from io import BytesIO
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS_DIR = 'pictures/renditions'
+
+# Cropped squares for the grids, a bounded full-size copy for detail pages
+RENDITIONS = {
+    'thumb': {'size': (160, 160), 'crop': True},
+    'card': {'size': (480, 480), 'crop': True},
+    'full': {'size': (1600, 1600), 'crop': False},
+}
+
+# WebP when this Pillow build can write it, JPEG otherwise
+if features.check('webp'):
+    RENDITION_FORMAT, RENDITION_EXTENSION = 'WEBP', 'webp'
+    SAVE_OPTIONS = {'quality': 80, 'method': 4}
+else:
+    RENDITION_FORMAT, RENDITION_EXTENSION = 'JPEG', 'jpg'
+    SAVE_OPTIONS = {'quality': 82, 'optimize': True, 'progressive': True}
+
+# Pattern of a rendition file name, used to route and validate requests
+RENDITION_NAME_PATTERN = r'[0-9a-f]{32}-(?:%s)\.(?:webp|jpg)' % '|'.join(RENDITIONS)
+
+
+def _prepare(image):
+    # Apply the camera's EXIF rotation before the metadata is dropped
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    if has_alpha and RENDITION_FORMAT == 'WEBP':
+        return image.convert('RGBA')
+    return image.convert('RGB')
+
+
+def render(image, name):
+    """Encoded bytes of rendition `name` of a prepared PIL image, without EXIF or other metadata"""
+    spec = RENDITIONS[name]
+    if spec['crop']:
+        resized = ImageOps.fit(image, spec['size'], Image.Resampling.LANCZOS)
+    else:
+        resized = image.copy()
+        resized.thumbnail(spec['size'], Image.Resampling.LANCZOS)
+    output = BytesIO()
+    resized.save(output, RENDITION_FORMAT, **SAVE_OPTIONS)
+    return output.getvalue()
+
+
+def save_renditions(source):
+    """
+    Write every rendition of an image file to storage under a path named by
+    the hash of its bytes, so a rendition URL never changes content and can
+    be cached forever.
+
+    Returns:
+        dict: rendition name -> storage path
+    """
+    with Image.open(source) as image:
+        image = _prepare(image)
+        paths = {}
+        for name in RENDITIONS:
+            content = render(image, name)
+            digest = hashlib.sha256(content).hexdigest()[:32]
+            path = f'{RENDITIONS_DIR}/{digest}-{name}.{RENDITION_EXTENSION}'
+            if not default_storage.exists(path):
+                default_storage.save(path, ContentFile(content))
+            paths[name] = path
+    return paths
+
+
+def update_picture_renditions(member, force=False):
+    """
+    Bring member.picture_renditions in line with member.picture, rendering
+    only when the picture changed (or `force`). Saved with a queryset
+    update, so no save signals fire again.
+
+    Returns:
+        bool: True if the renditions were rewritten
+    """
+    from .models import Member
+
+    renditions = member.picture_renditions or {}
+    if not member.picture:
+        if not renditions:
+            return False
+        renditions = {}
+    elif force or renditions.get('source') != member.picture.name:
+        try:
+            with member.picture.open('rb') as source:
+                renditions = {'source': member.picture.name, **save_renditions(source)}
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as e:
+            logger.warning(f"Member {member.pk}: could not render picture {member.picture.name}: {e}")
+            return False
+    else:
+        return False
+
+    member.picture_renditions = renditions
+    Member.objects.filter(pk=member.pk).update(picture_renditions=renditions)
+    return True
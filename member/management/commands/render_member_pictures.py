@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from member.images import update_picture_renditions
+from member.models import Member
+
+
+class Command(BaseCommand):
+    help = 'Generate the thumb/card/full renditions of member pictures uploaded before they existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Re-render pictures that already have renditions')
+
+    def handle(self, *args, **options):
+        members = (
+            Member.objects.exclude(picture__isnull=True).exclude(picture='')
+            .only('id', 'picture', 'picture_renditions')
+        )
+        rendered = skipped = 0
+        for member in members.iterator(chunk_size=200):
+            if update_picture_renditions(member, force=options['force']):
+                rendered += 1
+            else:
+                skipped += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Rendered {rendered} picture(s); {skipped} already up to date or unreadable'
+        ))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:19
+
+import phonenumbers
+from django.conf import settings
+from django.db import migrations, models
+
+
+def to_e164(value, region):
+    if not value:
+        return None
+    try:
+        number = phonenumbers.parse(str(value), region)
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_possible_number(number):
+        return None
+    return phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164)
+
+
+def backfill_phone_e164(apps, schema_editor):
+    Member = apps.get_model('member', 'Member')
+    region = getattr(settings, 'PHONENUMBER_DEFAULT_REGION', None) or 'TZ'
+    members = list(Member.objects.exclude(telephone__isnull=True).only('id', 'telephone'))
+    for member in members:
+        member.phone_e164 = to_e164(member.telephone, region)
+    Member.objects.bulk_update(members, ['phone_e164'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='phone_e164',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20, null=True),
+        ),
+        migrations.RunPython(backfill_phone_e164, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:34
+
+import re
+import unicodedata
+import phonenumbers
+from django.conf import settings
+from django.db import migrations, models
+
+
+def normalize_text(value):
+    value = unicodedata.normalize('NFKD', str(value or ''))
+    value = ''.join(c for c in value if not unicodedata.combining(c)).lower()
+    return re.sub(r'[^a-z0-9]+', ' ', value).strip()
+
+
+def backfill_search_key(apps, schema_editor):
+    Member = apps.get_model('member', 'Member')
+    region = getattr(settings, 'PHONENUMBER_DEFAULT_REGION', None) or 'TZ'
+    country_code = str(phonenumbers.country_code_for_region(region))
+    members = list(Member.objects.only('id', 'name', 'phone_e164'))
+    for member in members:
+        parts = [normalize_text(member.name)]
+        if member.phone_e164:
+            digits = member.phone_e164.lstrip('+')
+            parts.append(digits)
+            if digits.startswith(country_code):
+                parts.append('0' + digits[len(country_code):])
+        member.search_key = ' '.join(p for p in parts if p)
+    Member.objects.bulk_update(members, ['search_key'], batch_size=500)
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS member_search_key_trgm "
+            "ON member_member USING gin (search_key gin_trgm_ops)"
+        )
+    # The FTS5 trigram tokenizer arrived in SQLite 3.34
+    elif connection.vendor == 'sqlite' and connection.Database.sqlite_version_info >= (3, 34, 0):
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS member_autocomplete USING fts5("
+            "search_key, content='member_member', content_rowid='id', tokenize='trigram')"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER IF NOT EXISTS member_autocomplete_ai AFTER INSERT ON member_member BEGIN "
+            "INSERT INTO member_autocomplete(rowid, search_key) VALUES (new.id, new.search_key); END"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER IF NOT EXISTS member_autocomplete_ad AFTER DELETE ON member_member BEGIN "
+            "INSERT INTO member_autocomplete(member_autocomplete, rowid, search_key) "
+            "VALUES ('delete', old.id, old.search_key); END"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER IF NOT EXISTS member_autocomplete_au AFTER UPDATE OF search_key ON member_member BEGIN "
+            "INSERT INTO member_autocomplete(member_autocomplete, rowid, search_key) "
+            "VALUES ('delete', old.id, old.search_key); "
+            "INSERT INTO member_autocomplete(rowid, search_key) VALUES (new.id, new.search_key); END"
+        )
+        schema_editor.execute("INSERT INTO member_autocomplete(member_autocomplete) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS member_search_key_trgm")
+    elif vendor == 'sqlite':
+        for trigger in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS member_autocomplete_{trigger}")
+        schema_editor.execute("DROP TABLE IF EXISTS member_autocomplete")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0002_member_phone_e164'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='search_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=320),
+        ),
+        migrations.RunPython(backfill_search_key, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:37
+
+import re
+import unicodedata
+from django.db import migrations, models
+
+
+def normalize_text(value):
+    value = unicodedata.normalize('NFKD', str(value or ''))
+    value = ''.join(c for c in value if not unicodedata.combining(c)).lower()
+    return re.sub(r'[^a-z0-9]+', ' ', value).strip()
+
+
+def backfill_search_document(apps, schema_editor):
+    Member = apps.get_model('member', 'Member')
+    members = list(Member.objects.select_related('shepherd', 'ministry'))
+    for member in members:
+        parts = [
+            member.name,
+            member.shepherd.name if member.shepherd_id else '',
+            member.ministry.name if member.ministry_id else '',
+            member.location,
+            member.fathers_name,
+            member.mothers_name,
+        ]
+        member.search_document = ' '.join(filter(None, (normalize_text(part) for part in parts)))
+    Member.objects.bulk_update(members, ['search_document'], batch_size=500)
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        # Same expression SearchVector('search_document', config='simple') compiles to
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS member_search_document_gin "
+            "ON member_member USING gin (to_tsvector('simple'::regconfig, COALESCE(search_document, '')))"
+        )
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS member_search USING fts5("
+            "search_document, content='member_member', content_rowid='id', tokenize='unicode61')"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER IF NOT EXISTS member_search_ai AFTER INSERT ON member_member BEGIN "
+            "INSERT INTO member_search(rowid, search_document) VALUES (new.id, new.search_document); END"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER IF NOT EXISTS member_search_ad AFTER DELETE ON member_member BEGIN "
+            "INSERT INTO member_search(member_search, rowid, search_document) "
+            "VALUES ('delete', old.id, old.search_document); END"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER IF NOT EXISTS member_search_au AFTER UPDATE OF search_document ON member_member BEGIN "
+            "INSERT INTO member_search(member_search, rowid, search_document) "
+            "VALUES ('delete', old.id, old.search_document); "
+            "INSERT INTO member_search(rowid, search_document) VALUES (new.id, new.search_document); END"
+        )
+        schema_editor.execute("INSERT INTO member_search(member_search) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS member_search_document_gin")
+    elif vendor == 'sqlite':
+        for trigger in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS member_search_{trigger}")
+        schema_editor.execute("DROP TABLE IF EXISTS member_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0003_member_search_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_document, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
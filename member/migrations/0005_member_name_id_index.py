@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0004_member_search_document'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['name', 'id'], name='member_name_id_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0005_member_name_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='picture_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0006_member_picture_renditions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(condition=models.Q(('active', True)), fields=['shepherd', 'name', 'id'], name='member_active_shepherd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(condition=models.Q(('active', True)), fields=['ministry', 'name', 'id'], name='member_active_ministry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(condition=models.Q(('active', True), ('pays_tithe', True)), fields=['name', 'id'], name='member_active_tithe_idx'),
+        ),
+    ]
@@ -3,8 +3,14 @@ from enum import Enum
 import os, random
 from django.conf import settings
 from phonenumber_field.modelfields import PhoneNumberField
+import phonenumbers
+import re
+import unicodedata
 
+from django.core.cache import cache
+from django.urls import reverse
 from django.db import models
+from django.db.models import Count, Q
 
 
 def filename_ext(filepath):
@@ -20,6 +26,52 @@ def upload_image_path(instance, filename):
     return "pictures/{new_filename}/{final_filename}".format(new_filename=new_filename, final_filename=final_filename)
 
 
+def normalize_phone(value):
+    """
+    E.164 form (+255XXXXXXXXX) of a PhoneNumber or raw string, or None.
+    Local numbers are read in PHONENUMBER_DEFAULT_REGION (Tanzania by default).
+    """
+    if not value:
+        return None
+    region = getattr(settings, 'PHONENUMBER_DEFAULT_REGION', None) or 'TZ'
+    try:
+        number = phonenumbers.parse(str(value), region)
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_possible_number(number):
+        return None
+    return phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164)
+
+
+def normalize_search_text(value):
+    """Lowercase, accent-free text with runs of punctuation collapsed to a space"""
+    value = unicodedata.normalize('NFKD', str(value or ''))
+    value = ''.join(c for c in value if not unicodedata.combining(c)).lower()
+    return re.sub(r'[^a-z0-9]+', ' ', value).strip()
+
+
+def member_search_key(name, phone_e164):
+    """
+    Autocomplete key: the normalized name followed by the phone digits in
+    international (255...) and local (0...) form, so any of them matches.
+    """
+    parts = [normalize_search_text(name)]
+    if phone_e164:
+        digits = phone_e164.lstrip('+')
+        parts.append(digits)
+        region = getattr(settings, 'PHONENUMBER_DEFAULT_REGION', None) or 'TZ'
+        country_code = str(phonenumbers.country_code_for_region(region))
+        if digits.startswith(country_code):
+            parts.append('0' + digits[len(country_code):])
+    return ' '.join(p for p in parts if p)
+
+
+def member_search_document(name, community, ministry, location, fathers_name, mothers_name):
+    """Full-text search document: every searchable member field, normalized"""
+    parts = [name, community, ministry, location, fathers_name, mothers_name]
+    return ' '.join(filter(None, (normalize_search_text(part) for part in parts)))
+
+
 class Ministry(models.Model):
     name = models.CharField(max_length=255)
     feast_name = models.TextField(max_length=10, blank=True, null=True)
@@ -121,6 +173,9 @@ class Committee(models.Model):
         return name
 
 
+STATUS_COUNTS_CACHE_KEY = 'member-status-counts'
+
+
 class MemberManager(models.Manager):
     def get_by_id(self, id):
         qs = self.get_queryset().filter(id=id)
@@ -151,6 +206,34 @@ class MemberManager(models.Manager):
         # return self.get_queryset().filter(schooling=True)
         return self.active().filter(schooling=True)
 
+    def status_counts(self):
+        """
+        Sidebar counters of the member lists in one conditional-aggregation
+        query: active, pays_tithe, new_believer_school, working, schooling
+        (all among active members) and deleted. Cached for
+        MEMBER_STATUS_COUNTS_CACHE_TIMEOUT seconds; member saves and deletes
+        invalidate it.
+        """
+        counts = cache.get(STATUS_COUNTS_CACHE_KEY)
+        if counts is None:
+            active = Q(active=True)
+            # Aliases can't shadow the boolean fields they count
+            totals = self.get_queryset().aggregate(
+                active_count=Count('id', filter=active),
+                pays_tithe_count=Count('id', filter=active & Q(pays_tithe=True)),
+                new_believer_school_count=Count('id', filter=active & Q(new_believer_school=True)),
+                working_count=Count('id', filter=active & Q(working=True)),
+                schooling_count=Count('id', filter=active & Q(schooling=True)),
+                deleted_count=Count('id', filter=Q(active=False)),
+            )
+            counts = {name.removesuffix('_count'): total for name, total in totals.items()}
+            cache.set(STATUS_COUNTS_CACHE_KEY, counts,
+                      getattr(settings, 'MEMBER_STATUS_COUNTS_CACHE_TIMEOUT', 60))
+        return counts
+
+    def invalidate_status_counts(self):
+        cache.delete(STATUS_COUNTS_CACHE_KEY)
+
 
 class Member(models.Model):
     name = models.CharField(max_length=255)
@@ -159,6 +242,13 @@ class Member(models.Model):
     shepherd = models.ForeignKey(Community, on_delete=models.CASCADE, null=True, blank=True)
     ministry = models.ForeignKey(Ministry, on_delete=models.CASCADE, null=True, blank=True)
     telephone =PhoneNumberField(max_length=255, null=True, help_text=' Eg. +255 ')
+    # Normalized copy of telephone for SMS recipient lookups, kept in sync in save()
+    phone_e164 = models.CharField(max_length=20, null=True, blank=True, editable=False, db_index=True)
+    # Normalized name + phone digits for autocomplete, kept in sync in save()
+    search_key = models.CharField(max_length=320, blank=True, default='', editable=False)
+    # Names, community, ministry, location and parents for full-text search,
+    # kept in sync in save() and by the Community/Ministry signals
+    search_document = models.TextField(blank=True, default='', editable=False)
     location = models.CharField(max_length=255)
     fathers_name = models.CharField(max_length=255, null=True, blank=True)
     mothers_name = models.CharField(max_length=255, null=True, blank=True)
@@ -168,19 +258,110 @@ class Member(models.Model):
     working = models.BooleanField(default=False)
     schooling = models.BooleanField(default=False)
     picture = models.ImageField(upload_to=upload_image_path, null=True, blank=True)
+    # Storage paths of the resized copies of picture (see member.images),
+    # plus the picture they were made from under 'source'
+    picture_renditions = models.JSONField(default=dict, blank=True, editable=False)
     transfered = models.BooleanField(max_length=250, blank=True, null= True)
     transfer_update = models.CharField(max_length=250, null=True, blank=True)
 
     objects = MemberManager()
 
+    # Fields whose change rewrites search_document
+    SEARCH_DOCUMENT_FIELDS = ('name', 'shepherd', 'shepherd_id', 'ministry', 'ministry_id',
+                              'location', 'fathers_name', 'mothers_name')
+
     def __str__(self):
         return f'{self.name}'
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_search_source()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        # Loading single deferred fields must not overwrite unsaved changes
+        if fields is None:
+            self._remember_search_source()
+
+    def _search_source(self):
+        return (self.name, self.shepherd_id, self.ministry_id,
+                self.location, self.fathers_name, self.mothers_name)
+
+    def _remember_search_source(self):
+        # Values search_document was built from, unless some were deferred
+        self._saved_search_source = None if self.get_deferred_fields() else self._search_source()
+
+    def save(self, *args, **kwargs):
+        self.phone_e164 = normalize_phone(self.telephone)
+        self.search_key = member_search_key(self.name, self.phone_e164)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'telephone' in update_fields:
+                update_fields |= {'phone_e164', 'search_key'}
+            if 'name' in update_fields:
+                update_fields.add('search_key')
+            if update_fields & set(self.SEARCH_DOCUMENT_FIELDS):
+                update_fields.add('search_document')
+            kwargs['update_fields'] = update_fields
+        # Rebuilding reads the community and ministry names, so only do it
+        # when a field of the document changed since the member was loaded
+        if update_fields is None or 'search_document' in update_fields:
+            if self._search_source() != getattr(self, '_saved_search_source', None):
+                self.search_document = self.build_search_document()
+        super().save(*args, **kwargs)
+        self._remember_search_source()
+
+    def build_search_document(self):
+        return member_search_document(
+            self.name,
+            self.shepherd.name if self.shepherd_id else '',
+            self.ministry.name if self.ministry_id else '',
+            self.location,
+            self.fathers_name,
+            self.mothers_name,
+        )
+    
+    class Meta:
+        indexes = [
+            # Keyset pagination of the member lists seeks on (name, id)
+            models.Index(fields=['name', 'id'], name='member_name_id_idx'),
+            # Active members of one community or ministry, already in list
+            # order, for member_filters and the status lists
+            models.Index(fields=['shepherd', 'name', 'id'], condition=Q(active=True),
+                         name='member_active_shepherd_idx'),
+            models.Index(fields=['ministry', 'name', 'id'], condition=Q(active=True),
+                         name='member_active_ministry_idx'),
+            models.Index(fields=['name', 'id'], condition=Q(active=True, pays_tithe=True),
+                         name='member_active_tithe_idx'),
+        ]
+
     @property
     def picture_url(self):
         if self.picture and hasattr(self.picture, 'url'):
             return self.picture.url
         return f"{settings.STATIC_URL}images/default-avatar.png"
+
+    def picture_rendition_url(self, name):
+        """URL of a resized copy of the picture, or picture_url until one exists"""
+        path = (self.picture_renditions or {}).get(name)
+        if path and self.picture:
+            return reverse('member_picture', args=[os.path.basename(path)])
+        return self.picture_url
+
+    @property
+    def picture_thumb_url(self):
+        return self.picture_rendition_url('thumb')
+
+    @property
+    def picture_card_url(self):
+        return self.picture_rendition_url('card')
+
+    @property
+    def picture_full_url(self):
+        return self.picture_rendition_url('full')
     
 
 
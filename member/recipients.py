@@ -0,0 +1,66 @@
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from .models import Member
+
+VERSION_KEY = 'member-recipients:version'
+
+
+def _cache_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate_recipient_cache():
+    """Drop every cached recipient list (called when members change)"""
+    # A fresh random version orphans all old keys, even if the previous
+    # version was evicted from the cache
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def _recipients_queryset(recipient_type, object_id=None):
+    if recipient_type == 'MEMBER':
+        return Member.objects.filter(pk=object_id)
+    if recipient_type == 'MINISTRY':
+        return Member.objects.active().filter(ministry_id=object_id)
+    if recipient_type == 'COMMUNITY':
+        return Member.objects.active().filter(shepherd_id=object_id)
+    if recipient_type == 'ALL':
+        return Member.objects.active()
+    return Member.objects.none()
+
+
+def resolve_recipients(recipient_type, object_id=None):
+    """
+    List of (member_id, phone_e164) for a notification audience, read with a
+    single values_list query and cached until a member changes. phone_e164
+    is None for members without a usable number.
+
+    Args:
+        recipient_type: 'MEMBER', 'MINISTRY', 'COMMUNITY' or 'ALL'
+        object_id: Member, Ministry or Community id for the first three
+    """
+    if recipient_type == 'MEMBER':
+        # Single member lookups are cheap; don't fill the cache with them
+        return list(_recipients_queryset(recipient_type, object_id).values_list('id', 'phone_e164'))
+
+    key = f"member-recipients:{_cache_version()}:{recipient_type}:{object_id}"
+    recipients = cache.get(key)
+    if recipients is None:
+        recipients = list(
+            _recipients_queryset(recipient_type, object_id)
+            .order_by('id')
+            .values_list('id', 'phone_e164')
+        )
+        cache.set(key, recipients, getattr(settings, 'RECIPIENTS_CACHE_TIMEOUT', 300))
+    return recipients
+
+
+def resolve_phone_numbers(recipient_type, object_id=None):
+    """Distinct E.164 numbers for a notification audience"""
+    return list(dict.fromkeys(
+        phone for _, phone in resolve_recipients(recipient_type, object_id) if phone
+    ))
@@ -0,0 +1,265 @@
+import re
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from .models import Member, normalize_search_text
+
+AUTOCOMPLETE_TABLE = 'member_autocomplete'
+SEARCH_TABLE = 'member_search'
+AUTOCOMPLETE_VERSION_KEY = 'member-autocomplete:version'
+
+# FTS5 tables that migrations 0003 and 0004 create on SQLite, each fed from
+# one member_member column by triggers. Rebuilding member_member, as SQLite
+# does for many schema changes, drops those triggers
+FTS_TABLES = {
+    AUTOCOMPLETE_TABLE: 'search_key',
+    SEARCH_TABLE: 'search_document',
+}
+
+
+def _trigger_sql(table, column):
+    return {
+        f'{table}_ai': f"CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON member_member BEGIN "
+                       f"INSERT INTO {table}(rowid, {column}) VALUES (new.id, new.{column}); END",
+        f'{table}_ad': f"CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON member_member BEGIN "
+                       f"INSERT INTO {table}({table}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END",
+        f'{table}_au': f"CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE OF {column} ON member_member BEGIN "
+                       f"INSERT INTO {table}({table}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+                       f"INSERT INTO {table}(rowid, {column}) VALUES (new.id, new.{column}); END",
+    }
+
+
+def restore_search_triggers(db=None):
+    """
+    Re-create any missing trigger of the SQLite FTS5 tables and re-index
+    those tables, since rows changed while a trigger was gone are missing
+    from them. Runs after every migrate; PostgreSQL indexes survive table
+    changes, so there is nothing to do there.
+    """
+    db = db or connection
+    if db.vendor != 'sqlite':
+        return False
+
+    with db.cursor() as cursor:
+        tables = set(db.introspection.table_names(cursor))
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        triggers = {row[0] for row in cursor.fetchall()}
+        for table, column in FTS_TABLES.items():
+            if table not in tables:
+                continue
+            missing = [sql for name, sql in _trigger_sql(table, column).items() if name not in triggers]
+            if missing:
+                for sql in missing:
+                    cursor.execute(sql)
+                cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+    return True
+
+
+_fts_tables = set()
+
+
+def _has_fts_table(table):
+    if table not in _fts_tables and connection.vendor == 'sqlite':
+        if table in connection.introspection.table_names():
+            _fts_tables.add(table)
+    return table in _fts_tables
+
+
+def normalize_search_term(term):
+    """Phone-like terms become bare digits, anything else normalized text"""
+    term = str(term or '').strip()
+    if re.fullmatch(r'[\d\s+()-]+', term):
+        return re.sub(r'\D', '', term)
+    return normalize_search_text(term)
+
+
+def _matching_members(key):
+    members = Member.objects.all()
+    # FTS5 trigram queries need at least three characters
+    if len(key) >= 3 and _has_fts_table(AUTOCOMPLETE_TABLE):
+        quoted = '"%s"' % key.replace('"', '""')
+        return members.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {AUTOCOMPLETE_TABLE} WHERE {AUTOCOMPLETE_TABLE} MATCH %s", [quoted]
+        ))
+    # On PostgreSQL the trigram index serves this LIKE '%key%' directly
+    return members.filter(search_key__contains=key)
+
+
+def _cache_version():
+    version = cache.get(AUTOCOMPLETE_VERSION_KEY)
+    if version is None:
+        cache.add(AUTOCOMPLETE_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(AUTOCOMPLETE_VERSION_KEY)
+    return version
+
+
+def invalidate_autocomplete_cache():
+    cache.set(AUTOCOMPLETE_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def _cache_key(version, key):
+    return f'member-autocomplete:{version}:{key}'
+
+
+def autocomplete_members(term, limit=10):
+    """
+    Up to `limit` members whose name or phone contains `term`, as dicts
+    carrying everything a tithe form needs (active flag and community
+    included). Results are cached per prefix for MEMBER_AUTOCOMPLETE_CACHE_TIMEOUT
+    seconds; a shorter prefix that already returned every match is
+    narrowed in memory instead of querying again.
+    """
+    key = normalize_search_term(term)
+    if not key:
+        return []
+
+    version = _cache_version()
+    cached = cache.get(_cache_key(version, key))
+    if cached is None:
+        shorter = cache.get(_cache_key(version, key[:-1])) if len(key) > 1 else None
+        if shorter is not None and shorter['complete']:
+            rows = [row for row in shorter['rows'] if key in row['search_key']]
+        else:
+            rows = list(
+                _matching_members(key)
+                .order_by('name', 'id')
+                .values('id', 'name', 'telephone', 'phone_e164', 'active',
+                        'search_key', 'shepherd_id', 'shepherd__name')[:limit + 1]
+            )
+        cached = {'rows': rows[:limit], 'complete': len(rows) <= limit}
+        cache.set(_cache_key(version, key), cached,
+                  getattr(settings, 'MEMBER_AUTOCOMPLETE_CACHE_TIMEOUT', 30))
+
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'telephone': str(row['telephone']) if row['telephone'] else '',
+            'phone_e164': row['phone_e164'] or '',
+            'active': row['active'],
+            'community': {'id': row['shepherd_id'], 'name': row['shepherd__name']} if row['shepherd_id'] else None,
+        }
+        for row in cached['rows']
+    ]
+
+
+def refresh_search_documents(members):
+    """Rewrite search_document of `members` (a queryset), e.g. after a community or ministry rename"""
+    members = list(members.select_related('shepherd', 'ministry'))
+    changed = []
+    for member in members:
+        document = member.build_search_document()
+        if document != member.search_document:
+            member.search_document = document
+            changed.append(member)
+    Member.objects.bulk_update(changed, ['search_document'], batch_size=500)
+    return len(changed)
+
+
+class RankedSearchResults:
+    """
+    FTS5 matches ordered by bm25 rank, sliced in SQL so a Paginator only
+    ever loads one page of members.
+    """
+
+    def __init__(self, queryset, match):
+        self.queryset = queryset
+        self.match = match
+        self._count = None
+
+    def _sql(self, select):
+        inner, params = self.queryset.values('id').query.sql_with_params()
+        return (
+            f"SELECT {select} FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH %s AND {SEARCH_TABLE}.rowid IN ({inner})",
+            [self.match, *params],
+        )
+
+    def count(self):
+        if self._count is None:
+            sql, params = self._sql('COUNT(*)')
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        limit = -1 if index.stop is None else max(index.stop - start, 0)
+        sql, params = self._sql('rowid')
+        with connection.cursor() as cursor:
+            cursor.execute(f"{sql} ORDER BY rank, rowid LIMIT %s OFFSET %s", [*params, limit, start])
+            ids = [row[0] for row in cursor.fetchall()]
+        members = self.queryset.in_bulk(ids)
+        return [members[pk] for pk in ids if pk in members]
+
+
+def _postgres_query(words):
+    from django.contrib.postgres.search import SearchQuery, SearchVector
+
+    vector = SearchVector('search_document', config='simple')
+    query = SearchQuery(' & '.join(f'{word}:*' for word in words), config='simple', search_type='raw')
+    return vector, query
+
+
+def _fts_match(words):
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def filter_by_search(queryset, term):
+    """
+    Narrow `queryset` to members matching every word of `term` as a prefix,
+    through the full-text index but without ranking, so the caller keeps
+    its own ordering.
+    """
+    words = normalize_search_text(term).split()
+    if not words:
+        return queryset
+
+    if connection.vendor == 'postgresql':
+        vector, query = _postgres_query(words)
+        return queryset.annotate(search=vector).filter(search=query)
+
+    if _has_fts_table(SEARCH_TABLE):
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [_fts_match(words)]
+        ))
+
+    for word in words:
+        queryset = queryset.filter(search_document__contains=word)
+    return queryset
+
+
+def search_members(term, queryset=None):
+    """
+    Members matching every word of `term` as a prefix, anywhere in their
+    search document, best match first. Returns a queryset or a
+    RankedSearchResults; both paginate with django.core.paginator.Paginator.
+    """
+    queryset = Member.objects.active() if queryset is None else queryset
+    queryset = queryset.select_related('shepherd', 'ministry')
+    words = normalize_search_text(term).split()
+    if not words:
+        return queryset.order_by('name', 'id')
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchRank
+
+        vector, query = _postgres_query(words)
+        return (
+            queryset.annotate(search=vector, rank=SearchRank(vector, query))
+            .filter(search=query)
+            .order_by('-rank', 'name', 'id')
+        )
+
+    if _has_fts_table(SEARCH_TABLE):
+        return RankedSearchResults(queryset, _fts_match(words))
+
+    return filter_by_search(queryset, term).order_by('name', 'id')
@@ -0,0 +1,45 @@
+from django.db import connections
+from django.db.models.signals import post_save, post_delete, post_migrate
+from django.dispatch import receiver
+from .models import Member, Community, Ministry
+from .recipients import invalidate_recipient_cache
+from .search import invalidate_autocomplete_cache, refresh_search_documents, restore_search_triggers
+from .images import update_picture_renditions
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+def invalidate_member_caches(sender, instance, **kwargs):
+    """Cached recipient lists, autocomplete results and status counts are stale once any member changes"""
+    invalidate_recipient_cache()
+    invalidate_autocomplete_cache()
+    Member.objects.invalidate_status_counts()
+
+
+@receiver(post_save, sender=Member)
+def render_member_picture(sender, instance, raw=False, **kwargs):
+    """Resize a newly uploaded picture into its thumb/card/full renditions"""
+    if not raw:
+        update_picture_renditions(instance)
+
+
+@receiver(post_save, sender=Community)
+def invalidate_community_caches(sender, instance, created, **kwargs):
+    """Autocomplete results and member search documents carry the community name"""
+    invalidate_autocomplete_cache()
+    if not created:
+        refresh_search_documents(Member.objects.filter(shepherd=instance))
+
+
+@receiver(post_save, sender=Ministry)
+def refresh_ministry_search_documents(sender, instance, created, **kwargs):
+    """Member search documents carry the ministry name"""
+    if not created:
+        refresh_search_documents(Member.objects.filter(ministry=instance))
+
+
+@receiver(post_migrate)
+def ensure_search_index(sender, using, **kwargs):
+    """Re-create the search index triggers if a migration rebuilt member_member"""
+    if sender.name == 'member':
+        restore_search_triggers(connections[using])
@@ -1,3 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from .filters import filter_members, member_filter_lookups
+from .models import Community, Member, Ministry
+
+
+class MemberFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('filter', 'filter@example.com', 'password')
+        cls.community = Community.objects.create(name='St Peter')
+        cls.other_community = Community.objects.create(name='St Paul')
+        cls.ministry = Ministry.objects.create(name='Choir')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def create_members(self, count, start=0):
+        for i in range(start, start + count):
+            Member.objects.create(
+                name=f'Member {i:03d}',
+                location='Sinza',
+                new_believer_school=False,
+                pays_tithe=i % 2 == 0,
+                shepherd=self.community if i % 3 else self.other_community,
+                ministry=self.ministry if i % 4 == 0 else None,
+            )
+
+    def test_lookups_parse_flags_and_ids(self):
+        lookups = member_filter_lookups({
+            'pays_tithe': 'on',
+            'working': '0',
+            'shepherd': str(self.community.pk),
+            'ministry': 'Choir',
+            'unknown': 'on',
+        })
+        self.assertEqual(lookups, {'pays_tithe': True, 'working': False, 'shepherd_id': self.community.pk})
+
+    def test_filter_matches_on_ids_without_joins(self):
+        self.create_members(12)
+        members, _ = filter_members(Member.objects.active(), {
+            'pays_tithe': 'on',
+            'shepherd': str(self.community.pk),
+        })
+        self.assertNotIn('JOIN', str(members.query))
+
+        with self.assertNumQueries(1):
+            names = list(members.order_by('name').values_list('name', flat=True))
+        self.assertEqual(names, ['Member 002', 'Member 004', 'Member 008', 'Member 010'])
+
+    def test_filter_view_query_count_does_not_grow_with_members(self):
+        url = reverse('filter_members')
+        params = {'pays_tithe': 'on', 'shepherd': self.community.pk}
+
+        self.create_members(6)
+        # The first request also creates the user's profile
+        self.client.get(url, params)
+        cache.clear()
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+
+        self.create_members(40, start=6)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(len(many), len(few))
+        members = response.context['members']
+        self.assertTrue(members)
+        self.assertTrue(all(m.pays_tithe and m.shepherd_id == self.community.pk for m in members))
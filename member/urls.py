@@ -1,7 +1,8 @@
-from django.urls import path
+from django.urls import path, re_path
 
+from .images import RENDITION_NAME_PATTERN
 from .views import (
-    table_members, list_members, thumbnail_members, detail_member, edit_member, update_member, restore_member,
+    table_members, table_members_data, member_picture, list_members, thumbnail_members, detail_member, edit_member, update_member, restore_member,
     delete_member, filter_members, search_members, get_members_by_statuses, get_members_by_shepherds, list_deleted_members,
     ministry_detail, ministry_list, create_ministry,update_ministry,list_committees,create_committee,
     list_shepherds, add_shepherd, create_shepherd,edit_community,delete_community, delete_ministry,
@@ -12,7 +13,9 @@ urlpatterns = [
     # UrlConf For Members
     path('list/', list_members, name="list_members"),
     path('table/', table_members, name="table_members"),
+    path('table/data/', table_members_data, name="table_members_data"),
     path('thumbnail/', thumbnail_members, name="thumbnail_members"),
+    re_path(rf'^pictures/(?P<name>{RENDITION_NAME_PATTERN})$', member_picture, name="member_picture"),
     path('detail/<int:pk>/', detail_member, name="detail_member"),
     path('edit/<int:pk>/', edit_member, name="edit_member"),
     path('update/<int:pk>/', update_member, name="update_member"),
@@ -3,50 +3,176 @@ from django.contrib import messages
 from django.db.models import Q
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.http import JsonResponse
+from django.http import JsonResponse, FileResponse, Http404
+from django.core.files.storage import default_storage
 from django.db import transaction
 from django.forms import formset_factory
+from django.core.paginator import Paginator
 
 from .models import Community, Member, Ministry, CommunityLeader
+from . import search as member_search
+from . import filters as member_filters
+from christ_king_church.pagination import keyset_paginate
+from .images import RENDITIONS_DIR
 from users.models import UserProfile
 from .forms import MemberForm, MinistryForm, MinistryLeaderFormSet, ShepherdForm,Committee
 from django.contrib import messages
 
+MEMBER_SEARCH_PAGE_SIZE = 50
+MEMBER_LIST_PAGE_SIZE = 50
+MEMBER_THUMBNAIL_PAGE_SIZE = 24
+# Alphabetical, served by member_name_id_idx
+MEMBER_KEYSET_ORDERING = ('name', 'pk')
+
+# Columns table_members_data can return, by name, with the field each reads
+MEMBER_TABLE_COLUMNS = {
+    'id': 'id',
+    'name': 'name',
+    'community': 'shepherd__name',
+    'ministry': 'ministry__name',
+    'telephone': 'telephone',
+    'location': 'location',
+    'guardian': 'guardians_name',
+}
+MEMBER_TABLE_MAX_LENGTH = 100
+# Rendition URLs change whenever their content does, so browsers may keep them for a year
+MEMBER_PICTURE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def keyset_page(request, queryset, per_page=MEMBER_LIST_PAGE_SIZE):
+    """The (name, id) keyset page of `queryset` that ?after= / ?before= point at"""
+    return keyset_paginate(queryset, per_page, MEMBER_KEYSET_ORDERING, after=request.GET.get('after'), before=request.GET.get('before'))
+
+
+def status_totals():
+    """Sidebar counters shared by the member list views, from one cached query"""
+    counts = Member.objects.status_counts()
+    return {
+        "total": counts["active"],
+        "total_tithe": counts["pays_tithe"],
+        "total_new_believers": counts["new_believer_school"],
+        "total_schooling": counts["schooling"],
+        "total_working": counts["working"],
+        "total_delete": counts["deleted"],
+    }
+
 @login_required
 def table_members(request):
     template = "members/table.html"
-    members = Member.objects.active()
+    communities = Community.objects.order_by('name').values('id', 'name')
+    ministries = Ministry.objects.order_by('name').values('id', 'name')
     profile = UserProfile.objects.get_or_create(user=request.user)
-    context = {"members": members, "members_active_list": "active", "profile": profile}
+    context = {
+        "communities": communities,
+        "ministries": ministries,
+        "page_length": MEMBER_LIST_PAGE_SIZE,
+        "members_active_list": "active",
+        "profile": profile,
+    }
     return render(request, template, context)
 
 
+def _int_param(params, name, default):
+    try:
+        return int(params.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _table_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (int, str)):
+        return value
+    # PhoneNumber and friends
+    return str(value)
+
+
+@login_required
+def table_members_data(request):
+    """
+    One page of active members for the table view, in the DataTables
+    server-side format. Understands draw, start, length, search[value],
+    order[0][column]/order[0][dir] and columns[i][data] (any of
+    MEMBER_TABLE_COLUMNS), plus the member_filters parameters (status
+    flags, shepherd and ministry ids). Rows come back as arrays in column order.
+    """
+    params = request.GET
+    columns = []
+    while f'columns[{len(columns)}][data]' in params:
+        columns.append(params[f'columns[{len(columns)}][data]'])
+    if not columns:
+        columns = list(MEMBER_TABLE_COLUMNS)
+    unknown = [column for column in columns if column not in MEMBER_TABLE_COLUMNS]
+    if unknown:
+        return JsonResponse({'error': f"Unknown column(s): {', '.join(unknown)}"}, status=400)
+
+    members, lookups = member_filters.filter_members(Member.objects.active(), params)
+    filtered = bool(lookups)
+    search = params.get('search[value]', '').strip()
+    if search:
+        members = member_search.filter_by_search(members, search)
+        filtered = True
+
+    order_index = _int_param(params, 'order[0][column]', None)
+    order_field = MEMBER_TABLE_COLUMNS[columns[order_index]] if order_index in range(len(columns)) else 'name'
+    descending = '-' if params.get('order[0][dir]') == 'desc' else ''
+
+    start = max(_int_param(params, 'start', 0), 0)
+    length = _int_param(params, 'length', MEMBER_LIST_PAGE_SIZE)
+    length = MEMBER_TABLE_MAX_LENGTH if length < 1 else min(length, MEMBER_TABLE_MAX_LENGTH)
+
+    rows = (
+        members.order_by(f'{descending}{order_field}', f'{descending}id')
+        .values_list(*(MEMBER_TABLE_COLUMNS[column] for column in columns))[start:start + length]
+    )
+    # Counted live, like the rows, so the pager never disagrees with the data
+    total = Member.objects.active().count()
+    return JsonResponse({
+        'draw': _int_param(params, 'draw', 0),
+        'recordsTotal': total,
+        'recordsFiltered': members.count() if filtered else total,
+        'columns': columns,
+        'data': [[_table_cell(value) for value in row] for row in rows],
+    })
+
+
+@login_required
+def member_picture(request, name):
+    """A resized member picture, named by the hash of its content"""
+    try:
+        picture = default_storage.open(f'{RENDITIONS_DIR}/{name}', 'rb')
+    except FileNotFoundError:
+        raise Http404("Picture not found")
+    response = FileResponse(picture)
+    response['Cache-Control'] = f'private, max-age={MEMBER_PICTURE_MAX_AGE}, immutable'
+    return response
+
+
 @login_required
 def thumbnail_members(request):
     template = "members/thumbnail.html"
-    members = Member.objects.active()
-    shepherds = CommunityLeader.objects.all()
-    ministries = Ministry.objects.all()
+    page = keyset_page(request, Member.objects.active().select_related('shepherd', 'ministry'), MEMBER_THUMBNAIL_PAGE_SIZE)
+    communities = Community.objects.order_by('name').values('id', 'name')
+    ministries = Ministry.objects.order_by('name').values('id', 'name')
     profile = UserProfile.objects.get_or_create(user=request.user)
-    context = {"members": members, "members_active_list": "active", "ministries": ministries, "shepherds": shepherds, "profile": profile}
+    context = {"members": page.object_list, "keyset_page": page, "members_active_list": "active", "ministries": ministries, "communities": communities, "profile": profile}
     return render(request, template, context)
 
 
 @login_required
 def list_members(request):
     template = "members/list.html"
-    members = Member.objects.active()
+    page = keyset_page(request, Member.objects.active().select_related('shepherd', 'ministry'))
     shepherds = CommunityLeader.objects.all()
     ministries = Ministry.objects.all()
     profile = UserProfile.objects.get_or_create(user=request.user)
+    totals = status_totals()
     context = {
         "profile": profile,
-        "members": members, "shepherds": shepherds, "ministries": ministries, "total": len(members),
-        "total_tithe": len(Member.objects.pays_tithe()),
-        "total_new_believers": len(Member.objects.new_believer_school()),
-        "total_schooling": len(Member.objects.schooling()),
-        "total_working": len(Member.objects.working()),
-        "total_delete": len(members),
+        "members": page.object_list, "keyset_page": page, "shepherds": shepherds, "ministries": ministries,
+        **totals,
+        "result_count": totals["total"],
         "status": "all"
     }
     return render(request, template, context)
@@ -55,18 +181,17 @@ def list_members(request):
 @login_required
 def list_deleted_members(request):
     template = "members/list.html"
-    members = Member.objects.deleted()
+    page = keyset_page(request, Member.objects.deleted().select_related('shepherd', 'ministry'))
     shepherds = Community.objects.all()
     ministries = Ministry.objects.all()
     profile = UserProfile.objects.get_or_create(user=request.user)
+    totals = status_totals()
     context = {
         "profile": profile,
-        "members": members, "shepherds": shepherds, "ministries": ministries, "total": len(members),
-        "total_tithe": len(Member.objects.pays_tithe()),
-        "total_new_believers": len(Member.objects.new_believer_school()),
-        "total_schooling": len(Member.objects.schooling()),
-        "total_working": len(Member.objects.working()),
-        "total_delete": len(members),
+        "members": page.object_list, "keyset_page": page, "shepherds": shepherds, "ministries": ministries,
+        **totals,
+        "total": totals["total_delete"],
+        "result_count": totals["total_delete"],
         "status": "all",
         "active": "active"
     }
@@ -133,24 +258,23 @@ def restore_member(request, pk):
 @login_required
 def search_members(request):
     template = "members/list.html"
-    q = request.GET.get('q')
+    q = request.GET.get('q', '').strip()
     shepherds = CommunityLeader.objects.all()
     ministries = Ministry.objects.all()
     profile = UserProfile.objects.get_or_create(user=request.user)
-    context = {"ministries": ministries, "shepherds": shepherds, "profile": profile}
-    if q != '':
-        qs = Member.objects.active().filter(
-            Q(name__icontains=q) | Q(shepherd__name__icontains=q) | Q(ministry__name__icontains=q)|
-            Q(location__icontains=q) | Q(fathers_name__contains=q) | Q(mothers_name__contains=q)
-        )
-        context["members"] = qs
-        context['total'] = len(qs)
-        return render(request, template, context)
-    else:
-        members = Member.objects.active()
-        context['members'] = members
-        context['total'] = len(members)
-        return render(request, template, context)
+    paginator = Paginator(member_search.search_members(q), MEMBER_SEARCH_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    context = {
+        "ministries": ministries,
+        "shepherds": shepherds,
+        "profile": profile,
+        "members": page_obj.object_list,
+        "page_obj": page_obj,
+        "q": q,
+        **status_totals(),
+        "total": paginator.count,
+    }
+    return render(request, template, context)
 
 
 @login_required
@@ -159,7 +283,7 @@ def get_members_by_statuses(request, status):
     shepherds = CommunityLeader.objects.all()
     ministries = Ministry.objects.all()
     profile = UserProfile.objects.get_or_create(user=request.user)
-    members = None
+    members = Member.objects.none()
     if status == "tithe":
         members = Member.objects.pays_tithe()
     elif status == "new_believers":
@@ -168,18 +292,16 @@ def get_members_by_statuses(request, status):
         members = Member.objects.working()
     elif status == "schooling":
         members = Member.objects.schooling()
+    page = keyset_page(request, members.select_related('shepherd', 'ministry'))
 
     context = {
         "profile": profile,
-        "members": members,
+        "members": page.object_list,
+        "keyset_page": page,
         "shepherds": shepherds,
         "ministries": ministries,
-        "total": len(Member.objects.active()),
-        "total_tithe": len(Member.objects.pays_tithe()),
-        "total_new_believers": len(Member.objects.new_believer_school()),
-        "total_schooling": len(Member.objects.schooling()),
-        "total_working": len(Member.objects.working()),
-        "total_delete": len(Member.objects.deleted()),
+        **status_totals(),
+        "result_count": members.count(),
         status: status,
     }
     return render(request, template, context)
@@ -191,18 +313,16 @@ def get_members_by_shepherds(request, shepherd):
     shepherds = CommunityLeader.objects.all()
     ministries = Ministry.objects.all()
     members = Member.objects.active().filter(shepherd__name__icontains=shepherd)
+    page = keyset_page(request, members.select_related('shepherd', 'ministry'))
     profile = UserProfile.objects.get_or_create(user=request.user)
     context = {
         "profile": profile,
-        "members": members,
+        "members": page.object_list,
+        "keyset_page": page,
         "shepherds": shepherds,
         "ministries": ministries,
-        "total": len(Member.objects.active()),
-        "total_tithe": len(Member.objects.pays_tithe()),
-        "total_new_believers": len(Member.objects.new_believer_school()),
-        "total_schooling": len(Member.objects.schooling()),
-        "total_working": len(Member.objects.working()),
-        "total_delete": len(Member.objects.deleted()),
+        **status_totals(),
+        "result_count": members.count(),
         "shepherd_name": shepherd
     }
 
@@ -212,52 +332,25 @@ def get_members_by_shepherds(request, shepherd):
 @login_required
 def filter_members(request):
     template = "members/thumbnail.html"
-    shepherds = CommunityLeader.objects.all()
-    ministries = Ministry.objects.all()
-    initial_members = Member.objects.active()
-    statuses = []
-    for i in request.GET:
-        if request.GET.get(i) == 'on':
-            statuses.append(i)
-    for i in statuses:
-        if i == 'pays_tithe':
-            initial_members = initial_members.filter(pays_tithe=True)
-        elif i == 'working':
-            initial_members = initial_members.filter(working=True)
-        elif i == 'schooling':
-            initial_members = initial_members.filter(schooling=True)
-        elif i == "new_believer_school":
-            initial_members = initial_members.filter(new_believer_school=True)
-    # import pdb; pdb.set_trace()
-
-    ministry = request.GET.get('ministry')
+    communities = Community.objects.order_by('name').values('id', 'name')
+    ministries = Ministry.objects.order_by('name').values('id', 'name')
+    members, lookups = member_filters.filter_members(Member.objects.active(), request.GET)
+    page = keyset_page(request, members.select_related('shepherd', 'ministry'), MEMBER_THUMBNAIL_PAGE_SIZE)
     profile = UserProfile.objects.get_or_create(user=request.user)
 
     context = {
         "profile": profile,
-        "members": initial_members,
-        "shepherds": shepherds,
+        "members": page.object_list,
+        "keyset_page": page,
+        "communities": communities,
         "ministries": ministries,
-        "total": len(Member.objects.active()),
-        "total_tithe": len(Member.objects.pays_tithe()),
-        "total_new_believers": len(Member.objects.new_believer_school()),
-        "total_schooling": len(Member.objects.schooling()),
-        "total_working": len(Member.objects.working()),
-        ministry: ministry
+        **status_totals(),
+        "selected_shepherd": lookups.get('shepherd_id'),
+        "selected_ministry": lookups.get('ministry_id'),
     }
-    if ministry is not None:
-        initial_members = initial_members.filter(ministry__name__icontains=ministry)
-        context['members'] = initial_members
-        context['id_ministry'] = ministry
-
-    shepherd = request.GET.get('shepherd')
-    if shepherd is not None:
-        initial_members = initial_members.filter(shepherd__name__icontains=shepherd)
-        # import pdb; pdb.set_trace()
-        context['members'] = initial_members
-
-    for i in statuses:
-        context[i] = 'checked'
+    for field, value in lookups.items():
+        if value is True:
+            context[field] = 'checked'
 
     return render(request, template, context)
 
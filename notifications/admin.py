@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Notification, NotificationLog
+from .models import Notification, NotificationLog, NotificationJob
     
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
@@ -63,4 +63,18 @@ class NotificationLogAdmin(admin.ModelAdmin):
     ]
     list_filter = ['status', 'created_at']
     search_fields = ['member__name', 'phone_number', 'notification__title']
-    readonly_fields = ['created_at']
\ No newline at end of file
+    readonly_fields = ['created_at']
+
+
+@admin.register(NotificationJob)
+class NotificationJobAdmin(admin.ModelAdmin):
+    list_display = [
+        'notification', 
+        'status', 
+        'created_at',
+        'started_at',
+        'finished_at'
+    ]
+    list_filter = ['status', 'created_at']
+    search_fields = ['notification__title']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
@@ -0,0 +1,109 @@
+import logging
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Notification, NotificationJob
+from .services import NotificationService
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_broadcast(notification):
+    """
+    Queue a notification for the background worker. The one-active-job
+    constraint on NotificationJob makes concurrent calls agree on one job.
+    
+    Returns:
+        tuple: (job, created) - an already queued/running job is reused
+    """
+    with transaction.atomic():
+        job, created = NotificationJob.objects.get_or_create(
+            notification=notification,
+            status__in=['QUEUED', 'RUNNING']
+        )
+        if created:
+            Notification.objects.filter(id=notification.id).update(
+                status='PENDING',
+                error_message=None
+            )
+        return job, created
+
+
+def claim_next_job():
+    """Atomically move the oldest queued job to RUNNING"""
+    with transaction.atomic():
+        job = (
+            NotificationJob.objects.select_for_update(skip_locked=True)
+            .filter(status='QUEUED')
+            .order_by('created_at', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        
+        job.status = 'RUNNING'
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.save(update_fields=['status', 'started_at', 'heartbeat_at'])
+        return job
+
+
+def run_job(job):
+    """Send the job's notification and record the outcome on the job"""
+    def heartbeat():
+        NotificationJob.objects.filter(id=job.id, status='RUNNING').update(heartbeat_at=timezone.now())
+
+    result = NotificationService(heartbeat=heartbeat).send_notification(job.notification_id)
+    
+    job.status = 'DONE' if result.get('success') else 'FAILED'
+    job.error_message = result.get('error')
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error_message', 'finished_at'])
+    
+    logger.info("NOTIFICATION JOB %s: %s %s", job.id, job.status, result)
+    return result
+
+
+def fail_interrupted_jobs(minutes=10):
+    """
+    Mark jobs left RUNNING by a dead worker as FAILED: those whose
+    heartbeat has not been refreshed for `minutes`, however long ago they
+    started. They are not re-run automatically because part of the
+    broadcast may already have gone out.
+    """
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    stale = NotificationJob.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status='RUNNING'
+    )
+    with transaction.atomic():
+        # Locked so a heartbeat arriving meanwhile waits, then finds the job no longer RUNNING
+        jobs = list(stale.select_for_update().values_list('id', 'notification_id'))
+        if not jobs:
+            return 0
+        
+        error = 'Interrupted: the worker stopped before the broadcast finished'
+        Notification.objects.filter(id__in=[n for _, n in jobs], status='SENDING').update(
+            status='FAILED',
+            error_message=error
+        )
+        return NotificationJob.objects.filter(id__in=[j for j, _ in jobs]).update(
+            status='FAILED', error_message=error, finished_at=timezone.now()
+        )
+
+
+def get_progress(notification):
+    """Progress snapshot for the JSON progress endpoint"""
+    job = notification.jobs.order_by('-created_at', '-id').first()
+    processed = notification.sms_sent_count + notification.sms_failed_count
+    
+    return {
+        'id': notification.id,
+        'status': notification.status,
+        'job_status': job.status if job else None,
+        'total': notification.total_recipients,
+        'sent': notification.sms_sent_count,
+        'failed': notification.sms_failed_count,
+        'remaining': max(notification.total_recipients - processed, 0),
+        'finished': notification.status in ('SENT', 'FAILED') and (job is None or job.status in ('DONE', 'FAILED')),
+    }
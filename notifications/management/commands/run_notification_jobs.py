@@ -0,0 +1,37 @@
+import time
+from django.core.management.base import BaseCommand
+from notifications.jobs import claim_next_job, run_job, fail_interrupted_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run queued notification broadcasts (run continuously with --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling for jobs instead of exiting when none are queued')
+        parser.add_argument('--sleep', type=float, default=3,
+                            help='Seconds to wait between polls when no job is queued')
+
+    def handle(self, *args, **options):
+        while True:
+            # Checked on every poll, so jobs of a worker that died while
+            # another one keeps running are failed too
+            interrupted = fail_interrupted_jobs()
+            if interrupted:
+                self.stdout.write(self.style.WARNING(f'Marked {interrupted} interrupted job(s) as failed'))
+
+            job = claim_next_job()
+
+            if job is not None:
+                result = run_job(job)
+                self.stdout.write(
+                    f"Job {job.id} ({job.notification_id}): {job.status} - "
+                    f"{result.get('sent', 0)} sent, {result.get('failed', 0)} failed"
+                )
+                continue
+
+            if not options['loop']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS('No queued notification jobs'))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:59
+
+from django.db import migrations, models
+
+
+def fail_duplicate_jobs(apps, schema_editor):
+    NotificationJob = apps.get_model('notifications', 'NotificationJob')
+    active = NotificationJob.objects.filter(status__in=['QUEUED', 'RUNNING']).order_by('notification_id', 'created_at', 'id')
+    seen = set()
+    duplicates = []
+    for job_id, notification_id in active.values_list('id', 'notification_id'):
+        if notification_id in seen:
+            duplicates.append(job_id)
+        seen.add(notification_id)
+    NotificationJob.objects.filter(id__in=duplicates).update(
+        status='FAILED',
+        error_message='Duplicate of an earlier job for the same notification'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notificationjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notificationjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['QUEUED', 'RUNNING'])), fields=('notification',), name='notification_job_one_active'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from users.models import User
 from django.utils import timezone
 from member.models import Member, Ministry, Community
+from member.recipients import resolve_recipients
 
 class Notification(models.Model):
     STATUS_CHOICES = [
@@ -67,10 +68,10 @@ class Notification(models.Model):
     
     def get_recipients(self):
         """Get all recipients based on recipient_type"""
-        recipients = []
+        recipients = Member.objects.none()
         
         if self.recipient_type == 'MEMBER' and self.member:
-            recipients = [self.member]
+            recipients = Member.objects.filter(pk=self.member_id)
         elif self.recipient_type == 'MINISTRY' and self.ministry:
             recipients = Member.objects.active().filter(ministry=self.ministry)
         elif self.recipient_type == 'COMMUNITY' and self.community:
@@ -80,18 +81,22 @@ class Notification(models.Model):
         
         return recipients
     
+    def get_recipient_phones(self):
+        """(member_id, phone_e164) for every recipient, from the cached resolver"""
+        object_id = {
+            'MEMBER': self.member_id,
+            'MINISTRY': self.ministry_id,
+            'COMMUNITY': self.community_id,
+        }.get(self.recipient_type)
+        if self.recipient_type != 'ALL' and not object_id:
+            return []
+        return resolve_recipients(self.recipient_type, object_id)
+    
     def get_phone_numbers(self):
         """Extract valid phone numbers from recipients"""
-        recipients = self.get_recipients()
-        phone_numbers = []
-        
-        for recipient in recipients:
-            if recipient.telephone:
-                phone_str = str(recipient.telephone)
-                if phone_str and len(phone_str) > 5:
-                    phone_numbers.append(phone_str)
-        
-        return phone_numbers
+        return list(dict.fromkeys(
+            phone for _, phone in self.get_recipient_phones() if phone
+        ))
 
 
 class NotificationLog(models.Model):
@@ -113,4 +118,44 @@ class NotificationLog(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.notification.title} -> {self.member.name}"
\ No newline at end of file
+        return f"{self.notification.title} -> {self.member.name}"
+
+class NotificationJob(models.Model):
+    """Queued broadcast, picked up by the run_notification_jobs worker"""
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+    
+    notification = models.ForeignKey(
+        Notification, 
+        on_delete=models.CASCADE, 
+        related_name='jobs'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the worker while it sends; a RUNNING job whose heartbeat
+    # stops was left behind by a dead worker
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    error_message = models.TextField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+        constraints = [
+            # At most one queued or running job per notification
+            models.UniqueConstraint(
+                fields=['notification'],
+                condition=models.Q(status__in=['QUEUED', 'RUNNING']),
+                name='notification_job_one_active',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.notification.title} - {self.get_status_display()}"
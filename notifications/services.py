@@ -1,72 +1,29 @@
-import africastalking
 from django.conf import settings
 from django.utils import timezone
+from tithe.dispatch import dispatch, get_max_in_flight
+from tithe.service import sms_service
 from .models import Notification, NotificationLog
 
-class AfricasTalkingService:
-    """Service class for handling AfricasTalking SMS"""
-    
-    def __init__(self):
-        self.username = getattr(settings, 'AFRICASTALKING_USERNAME', '')  
-        self.api_key = getattr(settings, 'AFRICASTALKING_API_KEY', '') 
-        
-        if self.username and self.api_key:
-            africastalking.initialize(self.username, self.api_key)
-            self.sms = africastalking.SMS
-        else:
-            self.sms = None
-    
-    def send_sms(self, phone_numbers, message, sender_id=None):
-        """
-        Send SMS to multiple recipients
-        
-        Args:
-            phone_numbers: List of phone numbers
-            message: Message text
-            sender_id: Optional sender ID
-            
-        Returns:
-            dict: Response from AfricasTalking
-        """
-        if not self.sms:
-            return {
-                'success': False,
-                'error': 'AfricasTalking not configured'
-            }
-        
-        try:
-            # Ensure phone_numbers is a list
-            if isinstance(phone_numbers, str):
-                phone_numbers = [phone_numbers]
-            
-            # Send SMS
-            kwargs = {
-                'recipients': phone_numbers,
-                'message': message
-            }
-            
-            if sender_id:
-                kwargs['sender_id'] = sender_id
-            
-            response = self.sms.send(**kwargs)
-            
-            return {
-                'success': True,
-                'response': response
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
-
-
 class NotificationService:
     """Service class for handling notifications"""
     
-    def __init__(self):
-        self.at_service = AfricasTalkingService()
+    def __init__(self, bulk=None, chunk_size=None, log_batch_size=None, max_in_flight=None, heartbeat=None):
+        # Shared provider registry (SMS_PROVIDERS) with failover
+        self.sms_service = sms_service
+        self.max_in_flight = get_max_in_flight(max_in_flight)
+        # Bulk mode sends one provider request per chunk of recipients
+        self.bulk = getattr(settings, 'NOTIFICATION_SMS_BULK', True) if bulk is None else bulk
+        self.chunk_size = chunk_size or getattr(settings, 'NOTIFICATION_SMS_CHUNK_SIZE', 100)
+        # NotificationLog rows are buffered and written with bulk_create
+        self.log_batch_size = log_batch_size or getattr(settings, 'NOTIFICATION_LOG_BATCH_SIZE', 500)
+        # Called after every round of chunks to show the send is still alive
+        self.heartbeat = heartbeat
+        self._reset_progress()
+    
+    def _reset_progress(self):
+        self._pending_logs = []
+        self.sent_count = 0
+        self.failed_count = 0
     
     def send_notification(self, notification_id):
         """
@@ -78,22 +35,20 @@ class NotificationService:
         Returns:
             dict: Status of the operation
         """
+        self._reset_progress()
+        notifications = Notification.objects.filter(id=notification_id)
+        
         try:
-            notification = Notification.objects.get(id=notification_id)
+            notification = notifications.get()
+            recipients = notification.get_recipient_phones()
+            total_recipients = len(recipients)
             
-            # Update status to SENDING
-            notification.status = 'SENDING'
-            notification.save()
-            
-            # Get recipients
-            recipients = notification.get_recipients()
-            notification.total_recipients = recipients.count()
-            notification.save()
-            
-            if not recipients.exists():
-                notification.status = 'FAILED'
-                notification.error_message = 'No recipients found'
-                notification.save()
+            if not total_recipients:
+                notifications.update(
+                    status='FAILED',
+                    total_recipients=0,
+                    error_message='No recipients found'
+                )
                 return {
                     'success': False,
                     'error': 'No recipients found'
@@ -101,95 +56,40 @@ class NotificationService:
             
             # Send SMS if enabled
             if notification.send_sms:
-                sent_count = 0
-                failed_count = 0
+                notifications.update(
+                    status='SENDING',
+                    total_recipients=total_recipients,
+                    sms_sent_count=0,
+                    sms_failed_count=0,
+                    error_message=None
+                )
                 
-                for member in recipients:
-                    if not member.telephone:
-                        # Create log for failed send
-                        NotificationLog.objects.create(
-                            notification=notification,
-                            member=member,
-                            phone_number='N/A',
-                            status='FAILED',
-                            error_message='No phone number'
-                        )
-                        failed_count += 1
-                        continue
-                    
-                    phone_number = str(member.telephone)
-                    
-                    # Send SMS to individual
-                    result = self.at_service.send_sms(
-                        phone_numbers=[phone_number],
-                        message=notification.message
-                    )
-                    
-                    if result['success']:
-                        # Parse response
-                        response_data = result.get('response', {})
-                        sms_recipients = response_data.get('SMSMessageData', {}).get('Recipients', [])
-                        
-                        if sms_recipients:
-                            recipient_info = sms_recipients[0]
-                            status = recipient_info.get('status', 'Unknown')
-                            message_id = recipient_info.get('messageId', '')
-                            cost = recipient_info.get('cost', '')
-                            
-                            # Create log
-                            NotificationLog.objects.create(
-                                notification=notification,
-                                member=member,
-                                phone_number=phone_number,
-                                status='SENT' if status == 'Success' else 'FAILED',
-                                at_message_id=message_id,
-                                cost=cost,
-                                error_message=None if status == 'Success' else status
-                            )
-                            
-                            if status == 'Success':
-                                sent_count += 1
-                            else:
-                                failed_count += 1
-                        else:
-                            # No recipient info
-                            NotificationLog.objects.create(
-                                notification=notification,
-                                member=member,
-                                phone_number=phone_number,
-                                status='FAILED',
-                                error_message='No response from SMS service'
-                            )
-                            failed_count += 1
-                    else:
-                        # SMS send failed
-                        NotificationLog.objects.create(
-                            notification=notification,
-                            member=member,
-                            phone_number=phone_number,
-                            status='FAILED',
-                            error_message=result.get('error', 'Unknown error')
-                        )
-                        failed_count += 1
+                if self.bulk:
+                    self._send_bulk(notification, recipients)
+                else:
+                    self._send_individually(notification, recipients)
+                self._flush_logs(notification)
                 
-                # Update notification
-                notification.sms_sent_count = sent_count
-                notification.sms_failed_count = failed_count
-                notification.sent_at = timezone.now()
-                notification.status = 'SENT' if sent_count > 0 else 'FAILED'
-                notification.save()
+                notifications.update(
+                    status='SENT' if self.sent_count > 0 else 'FAILED',
+                    sent_at=timezone.now(),
+                    sms_sent_count=self.sent_count,
+                    sms_failed_count=self.failed_count
+                )
                 
                 return {
                     'success': True,
-                    'sent': sent_count,
-                    'failed': failed_count,
-                    'total': notification.total_recipients
+                    'sent': self.sent_count,
+                    'failed': self.failed_count,
+                    'total': total_recipients
                 }
             else:
                 # Just mark as sent without SMS
-                notification.status = 'SENT'
-                notification.sent_at = timezone.now()
-                notification.save()
+                notifications.update(
+                    status='SENT',
+                    total_recipients=total_recipients,
+                    sent_at=timezone.now()
+                )
                 
                 return {
                     'success': True,
@@ -203,11 +103,126 @@ class NotificationService:
             }
         except Exception as e:
             if 'notification' in locals():
-                notification.status = 'FAILED'
-                notification.error_message = str(e)
-                notification.save()
+                try:
+                    self._flush_logs(notification)
+                finally:
+                    notifications.update(status='FAILED', error_message=str(e))
             
             return {
                 'success': False,
                 'error': str(e)
             }
+    
+    def _send_individually(self, notification, recipients):
+        """Send one provider request per member"""
+        self._send_in_chunks(notification, recipients, chunk_size=1)
+    
+    def _send_bulk(self, notification, recipients):
+        """Send one provider request per chunk of `chunk_size` members"""
+        self._send_in_chunks(notification, recipients, chunk_size=self.chunk_size)
+    
+    def _send_in_chunks(self, notification, recipients, chunk_size):
+        """
+        Group (member_id, phone) recipients into chunks and send up to
+        `max_in_flight` chunks concurrently. Logging stays on this thread.
+        """
+        chunk = []
+        pending = []
+        
+        for member_id, phone_number in recipients:
+            if not phone_number:
+                self._log_failure(notification, member_id, 'N/A', 'No phone number')
+                continue
+            
+            chunk.append((member_id, phone_number))
+            if len(chunk) >= chunk_size:
+                pending.append(chunk)
+                chunk = []
+                if len(pending) >= self.max_in_flight:
+                    self._send_chunks(notification, pending)
+                    pending = []
+        
+        if chunk:
+            pending.append(chunk)
+        self._send_chunks(notification, pending)
+    
+    def _send_chunks(self, notification, chunks):
+        # A member may share a phone number with another member; send it once
+        batches = [list(dict.fromkeys(phone for _, phone in chunk)) for chunk in chunks]
+        # Each request waits on the limiter of the provider it goes to, so
+        # chunks that fail over are throttled at the fallback provider's rate
+        results = dispatch(
+            lambda phone_numbers: self.sms_service.send_bulk_sms(
+                phone_numbers, notification.message, rate_limit=True
+            ),
+            batches,
+            provider_name=None,
+            max_in_flight=self.max_in_flight
+        )
+        for chunk, result in zip(chunks, results):
+            self._log_chunk_result(notification, chunk, result)
+        if self.heartbeat:
+            self.heartbeat()
+    
+    def _log_chunk_result(self, notification, chunk, result):
+        """
+        Map the per-recipient results of a provider bulk request back onto
+        NotificationLog rows for every (member_id, phone) in the chunk.
+        """
+        if not result['success']:
+            # The whole request failed
+            error = result.get('error', 'Unknown error')
+            for member_id, phone_number in chunk:
+                self._log_failure(notification, member_id, phone_number, error)
+            return
+        
+        by_number = {r['phone_number']: r for r in result['recipients']}
+        
+        for member_id, phone_number in chunk:
+            recipient_info = by_number.get(phone_number)
+            
+            if recipient_info is None:
+                self._log_failure(notification, member_id, phone_number, 'No response from SMS service')
+                continue
+            
+            self._add_log(
+                notification,
+                member_id=member_id,
+                phone_number=phone_number,
+                status='SENT' if recipient_info['success'] else 'FAILED',
+                at_message_id=recipient_info.get('message_id') or '',
+                cost=recipient_info.get('cost') or '',
+                error_message=None if recipient_info['success'] else recipient_info.get('error')
+            )
+    
+    def _log_failure(self, notification, member_id, phone_number, error):
+        self._add_log(
+            notification,
+            member_id=member_id,
+            phone_number=phone_number,
+            status='FAILED',
+            error_message=error
+        )
+    
+    def _add_log(self, notification, **fields):
+        """Buffer a NotificationLog row and flush once the batch is full"""
+        self._pending_logs.append(NotificationLog(notification=notification, **fields))
+        if fields['status'] == 'SENT':
+            self.sent_count += 1
+        else:
+            self.failed_count += 1
+        
+        if len(self._pending_logs) >= self.log_batch_size:
+            self._flush_logs(notification)
+    
+    def _flush_logs(self, notification):
+        """Write buffered logs in one INSERT and publish progress counters"""
+        if not self._pending_logs:
+            return
+        
+        NotificationLog.objects.bulk_create(self._pending_logs, batch_size=self.log_batch_size)
+        self._pending_logs = []
+        Notification.objects.filter(id=notification.id).update(
+            sms_sent_count=self.sent_count,
+            sms_failed_count=self.failed_count
+        )
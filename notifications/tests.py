@@ -1,3 +1,113 @@
+from datetime import timedelta
+from unittest import mock
 from django.test import TestCase
+from django.utils import timezone
 
-# Create your tests here.
+from member.models import Member
+from tithe.service import SMSService
+from .jobs import claim_next_job, enqueue_broadcast, fail_interrupted_jobs
+from .models import Notification, NotificationJob, NotificationLog
+from .services import NotificationService
+
+
+class FakeProvider:
+    def __init__(self, name, success):
+        self.name = name
+        self.success = success
+        self.requests = []
+
+    def send_sms(self, phone_number, message):
+        self.requests.append([phone_number])
+        return {'success': self.success, 'error': None if self.success else 'down', 'provider': self.name}
+
+    def send_bulk_sms(self, phone_numbers, message):
+        self.requests.append(list(phone_numbers))
+        if not self.success:
+            return {'success': False, 'error': 'down', 'provider': self.name}
+        return {
+            'success': True,
+            'recipients': [{'phone_number': p, 'success': True, 'status': 'Success'} for p in phone_numbers],
+            'provider': self.name,
+        }
+
+
+class ProviderRateLimitTests(TestCase):
+    def setUp(self):
+        self.primary = FakeProvider('primary', success=False)
+        self.secondary = FakeProvider('secondary', success=True)
+        self.sms_service = SMSService(['primary', 'secondary'])
+        self.sms_service._providers = [self.primary, self.secondary]
+
+        self.limited = []
+        limiter = mock.patch('tithe.service.get_rate_limiter', side_effect=self.limiter_for)
+        limiter.start()
+        self.addCleanup(limiter.stop)
+
+    def limiter_for(self, name):
+        limiter = mock.Mock()
+        limiter.wait.side_effect = lambda: self.limited.append(name)
+        return limiter
+
+    def test_notification_chunks_are_limited_by_the_provider_that_sends_them(self):
+        members = [
+            Member.objects.create(name=f'Member {i}', location='Sinza', new_believer_school=False)
+            for i in range(4)
+        ]
+        notification = Notification.objects.create(title='Mass', message='Sunday mass at 9', recipient_type='ALL')
+        service = NotificationService(chunk_size=2, max_in_flight=1)
+        service.sms_service = self.sms_service
+
+        service._send_in_chunks(notification, [(m.id, f'+25571234567{i}') for i, m in enumerate(members)], 2)
+        service._flush_logs(notification)
+
+        self.assertEqual(len(self.secondary.requests), 2)
+        self.assertEqual(self.limited, ['primary', 'secondary', 'primary', 'secondary'])
+        self.assertEqual(NotificationLog.objects.filter(notification=notification, status='SENT').count(), 4)
+
+    def test_send_many_is_limited_by_the_provider_that_sends(self):
+        results = self.sms_service.send_many([('+255712345670', 'a'), ('+255712345671', 'b')], max_in_flight=1)
+
+        self.assertEqual([result['provider'] for result in results], ['secondary', 'secondary'])
+        self.assertEqual(self.limited, ['primary', 'secondary', 'primary', 'secondary'])
+
+
+class InterruptedJobTests(TestCase):
+    def setUp(self):
+        self.notification = Notification.objects.create(title='Mass', message='Sunday mass at 9', recipient_type='ALL')
+        self.job, _ = enqueue_broadcast(self.notification)
+        claim_next_job()
+
+    def age(self, started, heartbeat):
+        now = timezone.now()
+        NotificationJob.objects.filter(id=self.job.id).update(
+            started_at=now - timedelta(minutes=started),
+            heartbeat_at=now - timedelta(minutes=heartbeat) if heartbeat is not None else None,
+        )
+
+    def test_long_running_job_with_a_fresh_heartbeat_is_kept(self):
+        self.age(started=180, heartbeat=1)
+        self.assertEqual(fail_interrupted_jobs(), 0)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'RUNNING')
+        # Still the active job, so no duplicate can be queued
+        self.assertEqual(enqueue_broadcast(self.notification), (self.job, False))
+
+    def test_job_whose_heartbeat_stopped_is_failed(self):
+        self.age(started=30, heartbeat=15)
+        self.assertEqual(fail_interrupted_jobs(), 1)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'FAILED')
+
+    def test_sending_refreshes_the_heartbeat(self):
+        heartbeat = mock.Mock()
+        service = NotificationService(chunk_size=1, max_in_flight=1, heartbeat=heartbeat)
+        service.sms_service = mock.Mock()
+        service.sms_service.send_bulk_sms.side_effect = lambda phones, message, rate_limit: {
+            'success': True,
+            'recipients': [{'phone_number': p, 'success': True} for p in phones],
+        }
+        member = Member.objects.create(name='Member', location='Sinza', new_believer_school=False)
+
+        service._send_in_chunks(self.notification, [(member.id, '+255712345670'), (member.id, '+255712345671')], 1)
+
+        self.assertTrue(heartbeat.called)
@@ -8,4 +8,5 @@ urlpatterns = [
     path('notifications/<int:pk>/', views.notification_detail, name='notification_detail'),
     path('notifications/<int:pk>/send/', views.notification_send, name='notification_send'),
     path('notifications/<int:pk>/preview/', views.notification_preview, name='notification_preview'),
+    path('notifications/<int:pk>/progress/', views.notification_progress, name='notification_progress'),
 ]
\ No newline at end of file
@@ -1,17 +1,9 @@
 from django.apps import apps
+from member.recipients import resolve_phone_numbers
 
 def get_minister_members(ministry):
     """Get all members belonging to a ministry"""
-    phones = []
-    try:
-        Member = apps.get_model('members', 'Member')
-        members = Member.objects.filter(ministry=ministry, active=True)
-        for member in members:
-            if member.telephone:
-                phones.append(str(member.telephone))
-    except Exception as e:
-        print(f"Error getting ministry members: {e}")
-    return phones
+    return resolve_phone_numbers('MINISTRY', ministry.id)
 
 def get_ministry_leaders_phone(ministry):
     """Get phone numbers of ministry leaders"""
@@ -33,16 +25,7 @@ def get_ministry_leaders_phone(ministry):
 
 def get_community_members(community):
     """Get all members belonging to a community"""
-    phones = []
-    try:
-        Member = apps.get_model('members', 'Member')
-        members = Member.objects.filter(shepherd=community, active=True)
-        for member in members:
-            if member.telephone:
-                phones.append(str(member.telephone))
-    except Exception as e:
-        print(f"Error getting community members: {e}")
-    return phones
+    return resolve_phone_numbers('COMMUNITY', community.id)
 
 def get_community_leaders_phone(community):
     """Get phone numbers of community leaders"""
@@ -62,27 +45,19 @@ def get_committee_members(committee):
     """Get members of a specific committee"""
     phones = []
     try:
-        Member = apps.get_model('members', 'Member')
-        members = Member.objects.filter(committee__id=committee.id, active=True)
-        for member in members:
-            if member.telephone:
-                phones.append(str(member.telephone))
+        Member = apps.get_model('member', 'Member')
+        phones = list(
+            Member.objects.filter(committee__id=committee.id, active=True, phone_e164__isnull=False)
+            .values_list('phone_e164', flat=True)
+            .distinct()
+        )
     except Exception as e:
         print(f"Error getting committee members: {e}")
     return phones
 
 def get_all_members_phones():
     """Get phone numbers of all active members"""
-    phones = []
-    try:
-        Member = apps.get_model('members', 'Member')
-        members = Member.objects.filter(active=True)
-        for member in members:
-            if member.telephone:
-                phones.append(str(member.telephone))
-    except Exception as e:
-        print(f"Error getting all members: {e}")
-    return phones
+    return resolve_phone_numbers('ALL')
 
 def format_phone_for_kenya(phone_number):
     """Format phone number for Tz (+255)"""
@@ -5,7 +5,7 @@ from django.http import JsonResponse
 from django.core.paginator import Paginator
 from .models import Notification, NotificationLog
 from .forms import NotificationForm
-from .services import NotificationService
+from .jobs import enqueue_broadcast, get_progress
 
 @login_required
 def notification_list(request):
@@ -34,19 +34,13 @@ def notification_create(request):
             notification.created_by = request.user
             notification.save()
             
-            # Send notification if send_sms is True
+            # Queue the broadcast for the background worker if send_sms is True
             if notification.send_sms:
-                service = NotificationService()
-                result = service.send_notification(notification.id)
-                
-                if result['success']:
-                    messages.success(
-                        request,
-                        f"Notification sent! {result.get('sent', 0)} successful, "
-                        f"{result.get('failed', 0)} failed"
-                    )
-                else:
-                    messages.error(request, f"Error: {result.get('error')}")
+                enqueue_broadcast(notification)
+                messages.success(
+                    request,
+                    'Notification queued for sending. Progress updates below.'
+                )
             else:
                 messages.success(request, 'Notification created successfully')
             
@@ -78,17 +72,12 @@ def notification_send(request, pk):
     notification = get_object_or_404(Notification, pk=pk)
     
     if request.method == 'POST':
-        service = NotificationService()
-        result = service.send_notification(notification.id)
+        job, created = enqueue_broadcast(notification)
         
-        if result['success']:
-            messages.success(
-                request,
-                f"Notification sent! {result.get('sent', 0)} successful, "
-                f"{result.get('failed', 0)} failed"
-            )
+        if created:
+            messages.success(request, 'Notification queued for sending')
         else:
-            messages.error(request, f"Error: {result.get('error')}")
+            messages.info(request, 'This notification is already being sent')
     
     return redirect('notification_detail', pk=pk)
 
@@ -101,7 +90,7 @@ def notification_preview(request, pk):
     phone_numbers = notification.get_phone_numbers()
     
     data = {
-        'total_recipients': recipients.count(),
+        'total_recipients': len(notification.get_recipient_phones()),
         'valid_phones': len(phone_numbers),
         'recipients': [
             {
@@ -112,4 +101,11 @@ def notification_preview(request, pk):
         ]
     }
     
-    return JsonResponse(data)
\ No newline at end of file
+    return JsonResponse(data)
+
+
+@login_required
+def notification_progress(request, pk):
+    """JSON progress of a queued or running broadcast"""
+    notification = get_object_or_404(Notification, pk=pk)
+    return JsonResponse(get_progress(notification))
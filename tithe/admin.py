@@ -1,6 +1,14 @@
 from django.contrib import admin
-from .models import TithePayment
+from .models import TithePayment, OutboundSMS
 
 # Register your models here.
 
 admin.site.register(TithePayment)
+
+
+@admin.register(OutboundSMS)
+class OutboundSMSAdmin(admin.ModelAdmin):
+    list_display = ['phone_number', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'tithe_payment']
+    list_filter = ['status', 'created_at']
+    search_fields = ['phone_number', 'provider_message_id']
+    readonly_fields = ['created_at', 'sent_at']
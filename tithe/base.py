@@ -1,20 +1,46 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Tuple
+from .dispatch import dispatch
 
 class BaseSMSProvider(ABC):
     """Abstract base class for all SMS providers"""
     
+    # Key used for results and for SMS_RATE_LIMITS
+    name = 'sms'
+    
     @abstractmethod
     def send_sms(self, phone_number: str, message: str) -> Dict[str, Any]:
         """Send SMS to a single number"""
         pass
     
     @abstractmethod
-    def send_bulk_sms(self, recipients: list) -> Dict[str, Any]:
-        """Send SMS to multiple numbers"""
+    def send_bulk_sms(self, phone_numbers: list, message: str) -> Dict[str, Any]:
+        """
+        Send the same SMS to multiple numbers using the provider's native batch API.
+        
+        Returns a dict with `success` (the request itself went through),
+        `error` when it did not, and `recipients`: one entry per number, in
+        order, with `phone_number`, `success`, `status`, `message_id`, `cost`
+        and `error`.
+        """
         pass
     
     @abstractmethod
     def get_balance(self) -> Dict[str, Any]:
         """Get account balance"""
-        pass
\ No newline at end of file
+        pass
+    
+    def send_many(self, messages: Iterable[Tuple[str, str]], max_in_flight: int = None) -> List[Dict[str, Any]]:
+        """
+        Send individual (phone_number, message) pairs concurrently, with at most
+        `max_in_flight` (default SMS_MAX_IN_FLIGHT) requests open at once and
+        the provider's SMS_RATE_LIMITS entry respected.
+        
+        Returns results in the same order as `messages`.
+        """
+        return dispatch(
+            lambda item: self.send_sms(*item),
+            messages,
+            provider_name=self.name,
+            max_in_flight=max_in_flight
+        )
\ No newline at end of file
@@ -0,0 +1,169 @@
+import csv
+import logging
+from datetime import date as date_type, datetime, time
+from decimal import Decimal, InvalidOperation
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from member.models import Member
+from .models import TithePayment
+from .rollups import apply_new_payments
+from .signals import tithe_sms_for
+from .sms_queue import enqueue_many
+
+logger = logging.getLogger(__name__)
+
+# Spreadsheet headings accepted for each TithePayment field
+COLUMN_ALIASES = {
+    'member_id': 'member_id',
+    'member': 'member_id',
+    'amount': 'amount',
+    'status': 'status',
+    'payment_method': 'status',
+    'method': 'status',
+    'date': 'date',
+}
+
+
+def _normalize_heading(heading):
+    key = str(heading or '').strip().lower().replace(' ', '_')
+    return COLUMN_ALIASES.get(key, key)
+
+
+def read_rows(path):
+    """Rows of a .csv or .xlsx file as dicts keyed by normalized heading"""
+    if str(path).lower().endswith('.xlsx'):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportError("Reading .xlsx files requires openpyxl (pip install openpyxl)")
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        headings = [_normalize_heading(h) for h in next(rows, [])]
+        data = [dict(zip(headings, row)) for row in rows if any(cell not in (None, '') for cell in row)]
+        workbook.close()
+        return data
+
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        headings = [_normalize_heading(h) for h in next(reader, [])]
+        return [dict(zip(headings, row)) for row in reader if any(cell.strip() for cell in row)]
+
+
+def _parse_date(value, default):
+    if value in (None, ''):
+        return default
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.strip())
+    elif not isinstance(value, date_type):
+        raise ValueError(f"Expected an ISO date, got {value!r}")
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.min)
+    if settings.USE_TZ and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def validate_rows(rows, default_date=None):
+    """
+    Turn raw rows (dicts) into unsaved TithePayments. Every member is
+    looked up in one query; a row that is not a dict is reported as an error.
+
+    Returns:
+        tuple: (payments, errors) where errors is a list of
+        (row number, message), row numbers starting at 1
+    """
+    default_date = _parse_date(default_date, timezone.now())
+    statuses = {value: value for value, _ in TithePayment.PAYMENT_STATUS_CHOICES}
+    statuses.update({label.lower(): value for value, label in TithePayment.PAYMENT_STATUS_CHOICES})
+
+    member_ids = set()
+    for row in rows:
+        try:
+            member_ids.add(int(row.get('member_id')))
+        except (AttributeError, TypeError, ValueError):
+            pass
+    members = Member.objects.only('id', 'name', 'telephone', 'phone_e164').in_bulk(member_ids)
+
+    amount_field = TithePayment._meta.get_field('amount')
+    cent = Decimal(1).scaleb(-amount_field.decimal_places)
+    max_amount = Decimal(10) ** (amount_field.max_digits - amount_field.decimal_places)
+
+    payments, errors = [], []
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append((number, f"Expected an object with the payment fields, got {row!r}"))
+            continue
+        try:
+            member = members.get(int(row.get('member_id')))
+        except (TypeError, ValueError):
+            errors.append((number, f"Invalid member id {row.get('member_id')!r}"))
+            continue
+        if member is None:
+            errors.append((number, f"Member {row.get('member_id')} not found"))
+            continue
+
+        try:
+            amount = Decimal(str(row.get('amount')).replace(',', '').strip())
+        except InvalidOperation:
+            amount = None
+        if amount is None or not amount.is_finite():
+            errors.append((number, f"Invalid amount {row.get('amount')!r}"))
+            continue
+        # Only quantize what fits TithePayment.amount; rounding may still reach the limit
+        if abs(amount) < max_amount:
+            amount = amount.quantize(cent)
+        if amount >= max_amount:
+            errors.append((number, f"Amount must be less than {max_amount:,}"))
+            continue
+        if amount <= 0:
+            errors.append((number, "Amount must be greater than zero"))
+            continue
+
+        status = statuses.get(str(row.get('status') or 'cash').strip().lower())
+        if status is None:
+            errors.append((number, f"Unknown payment method {row.get('status')!r}"))
+            continue
+
+        try:
+            date = _parse_date(row.get('date'), default_date)
+        except (TypeError, ValueError):
+            errors.append((number, f"Invalid date {row.get('date')!r}"))
+            continue
+
+        payments.append(TithePayment(
+            name=member,
+            contact_number=str(member.telephone or ''),
+            amount=amount,
+            status=status,
+            date=date,
+        ))
+
+    return payments, errors
+
+
+def create_payments(payments):
+    """
+    Insert payments with one bulk INSERT in a single transaction, then bring
+    the rollups up to date and queue the thank-you SMS in batch, which the
+    per-row post_save signals would otherwise have done.
+
+    Returns:
+        list: The saved payments
+    """
+    with transaction.atomic():
+        payments = TithePayment.objects.bulk_create(payments, batch_size=500)
+        apply_new_payments(payments)
+
+        if getattr(settings, 'SEND_SMS_ENABLED', False):
+            messages = []
+            for payment in payments:
+                sms = tithe_sms_for(payment)
+                if sms is None:
+                    logger.warning(f"Tithe ID {payment.id}: No contact number provided.")
+                    continue
+                messages.append((*sms, payment))
+            enqueue_many(messages)
+
+    return payments
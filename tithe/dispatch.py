@@ -0,0 +1,73 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls at least 1/rate seconds apart.
+    A rate of None or 0 disables limiting.
+    """
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider_name):
+    """Process-wide limiter for a provider, configured by SMS_RATE_LIMITS"""
+    with _limiters_lock:
+        if provider_name not in _limiters:
+            rate = getattr(settings, 'SMS_RATE_LIMITS', {}).get(provider_name)
+            _limiters[provider_name] = RateLimiter(rate)
+        return _limiters[provider_name]
+
+
+def get_max_in_flight(max_in_flight=None):
+    return max_in_flight or getattr(settings, 'SMS_MAX_IN_FLIGHT', 4)
+
+
+def dispatch(send, items, provider_name, max_in_flight=None):
+    """
+    Call `send(item)` for every item on a bounded thread pool, respecting the
+    provider's rate limit. With no `provider_name`, `send` is left to do its
+    own limiting. Exceptions are turned into failure results.
+
+    Returns:
+        list: Results in the same order as `items`
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    limiter = get_rate_limiter(provider_name) if provider_name else RateLimiter()
+
+    def run(item):
+        limiter.wait()
+        try:
+            return send(item)
+        except Exception as e:
+            return {'success': False, 'error': str(e), 'provider': provider_name}
+
+    workers = min(get_max_in_flight(max_in_flight), len(items))
+    if workers == 1:
+        return [run(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run, items))
@@ -0,0 +1,52 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.conf import settings
+from .dispatch import get_max_in_flight
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_timeout():
+    """(connect, read) timeout in seconds for gateway requests"""
+    return getattr(settings, 'SMS_HTTP_TIMEOUT', (5, 30))
+
+
+def _build_session(headers=None, auth=None):
+    retries = getattr(settings, 'SMS_HTTP_RETRIES', 2)
+    # Only retry when the request never reached the gateway or it asked us
+    # to back off; never after a read failure, which could duplicate an SMS
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        status_forcelist=(429, 503),
+        allowed_methods=frozenset({'GET', 'POST'}),
+        backoff_factor=0.5,
+        respect_retry_after_header=True,
+    )
+    pool_size = getattr(settings, 'SMS_HTTP_POOL_SIZE', None) or get_max_in_flight()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(headers or {})
+    session.auth = auth
+    return session
+
+
+def get_session(key, headers=None, auth=None):
+    """
+    Process-wide keep-alive session for one provider account. `headers` and
+    `auth` are applied once when the session is first built, so credentials
+    are not re-encoded on every request.
+    """
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = _build_session(headers, auth)
+        return session
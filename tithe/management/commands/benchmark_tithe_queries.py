@@ -0,0 +1,53 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from tithe.models import TithePayment
+
+
+class Command(BaseCommand):
+    help = (
+        'Print the query plan and average run time of the hot TithePayment '
+        'queries. Run it before and after `migrate tithe` to compare plans '
+        'with and without the indexes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30,
+                            help='Width of the date range queried (default: 30)')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Runs averaged per query (default: 20)')
+
+    def get_queries(self, days):
+        end = timezone.localdate()
+        start = end - timedelta(days=days)
+        payments = TithePayment.objects.all()
+        member_id = payments.values_list('name_id', flat=True).first() or 0
+
+        return [
+            ('Date range with __date cast (old)',
+             payments.filter(date__date__range=[start, end]).order_by('-date')),
+            ('Date range on date (new)',
+             payments.between_days(start, end).order_by('-date')),
+            ('Method over a period with __date cast (old)',
+             payments.filter(status='cash', date__date__range=[start, end])),
+            ('Method over a period on date (new)',
+             payments.filter(status='cash').between_days(start, end)),
+            ('Member history',
+             payments.filter(name_id=member_id).order_by('-date')),
+            ('Failed SMS notifications',
+             payments.filter(sms_sent=False, sms_failure_count__gt=0)),
+        ]
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{TithePayment.objects.count()} payments\n')
+
+        for label, queryset in self.get_queries(options['days']):
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                list(queryset.values_list('id', flat=True))
+            elapsed = (time.perf_counter() - started) / options['repeat'] * 1000
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{label}: {elapsed:.2f} ms'))
+            self.stdout.write(queryset.explain())
+            self.stdout.write('')
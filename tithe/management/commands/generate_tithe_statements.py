@@ -0,0 +1,57 @@
+import calendar
+import csv
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.utils import timezone
+from tithe.statements import yearly_statements
+
+
+class Command(BaseCommand):
+    help = 'Write the yearly tithe giving statement of every member to one printable file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, default=timezone.localdate().year - 1,
+                            help='Statement year (default: last year)')
+        parser.add_argument('--member', type=int, action='append', dest='members',
+                            help='Only this member id (repeatable)')
+        parser.add_argument('--format', choices=['html', 'csv'], default='html',
+                            help='One statement per page as HTML, or one row per member as CSV')
+        parser.add_argument('--output', default=None,
+                            help='Output file (default: tithe_statements_<year>.<format>)')
+
+    def handle(self, *args, **options):
+        year = options['year']
+        output = options['output'] or f"tithe_statements_{year}.{options['format']}"
+        statements = yearly_statements(year, options['members'])
+
+        if options['format'] == 'csv':
+            count = self.write_csv(output, statements)
+        else:
+            statements = list(statements)
+            count = len(statements)
+            with open(output, 'w', encoding='utf-8') as f:
+                f.write(render_to_string('tithepayment/yearly_statements.html', {
+                    'statements': statements,
+                    'year': year,
+                }))
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {count} statement(s) for {year} to {output}'))
+
+    def write_csv(self, output, statements):
+        count = 0
+        with open(output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                ['Member ID', 'Member Name', 'Telephone']
+                + list(calendar.month_name[1:])
+                + ['Payments', 'Total']
+            )
+            for statement in statements:
+                member = statement['member']
+                writer.writerow(
+                    [member.id, member.name, member.telephone or '']
+                    + [month['total'] for month in statement['months']]
+                    + [statement['payment_count'], statement['total']]
+                )
+                count += 1
+        return count
@@ -0,0 +1,49 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from tithe.bulk import read_rows, validate_rows, create_payments
+
+
+class Command(BaseCommand):
+    help = (
+        'Import tithe payments from a .csv or .xlsx sheet with columns '
+        'member_id, amount and optionally payment_method and date'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Spreadsheet to import')
+        parser.add_argument('--date', default=None,
+                            help='Date (YYYY-MM-DD) for rows without one (default: now)')
+        parser.add_argument('--skip-invalid', action='store_true',
+                            help='Import the valid rows even if some rows are invalid')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Validate the sheet without saving anything')
+
+    def handle(self, *args, **options):
+        default_date = None
+        if options['date']:
+            try:
+                default_date = datetime.strptime(options['date'], '%Y-%m-%d')
+            except ValueError:
+                raise CommandError('--date must be YYYY-MM-DD')
+
+        try:
+            rows = read_rows(options['path'])
+        except (OSError, ImportError) as e:
+            raise CommandError(str(e))
+
+        payments, errors = validate_rows(rows, default_date)
+        for number, error in errors:
+            # Row numbers in the sheet, counting the heading row
+            self.stderr.write(f'Row {number + 1}: {error}')
+
+        if errors and not options['skip_invalid']:
+            raise CommandError(f'{len(errors)} invalid row(s); nothing imported (use --skip-invalid to import the rest)')
+
+        total = sum(payment.amount for payment in payments)
+        if options['dry_run']:
+            self.stdout.write(f'{len(payments)} valid payment(s) totalling {total:,.2f}; nothing saved (dry run)')
+            return
+
+        create_payments(payments)
+        self.stdout.write(self.style.SUCCESS(f'Imported {len(payments)} payment(s) totalling {total:,.2f}'))
+
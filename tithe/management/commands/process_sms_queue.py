@@ -0,0 +1,36 @@
+import time
+from django.core.management.base import BaseCommand
+from tithe.sms_queue import process_batch, release_stale
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued tithe SMS messages (run continuously with --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Messages claimed per batch (default: SMS_QUEUE_BATCH_SIZE)')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling the queue instead of exiting when it is empty')
+        parser.add_argument('--sleep', type=float, default=5,
+                            help='Seconds to wait between polls when the queue is empty')
+
+    def handle(self, *args, **options):
+        released = release_stale()
+        if released:
+            self.stdout.write(self.style.WARNING(f'Released {released} stale message(s) back to the queue'))
+
+        while True:
+            result = process_batch(options['batch_size'])
+
+            if result['claimed']:
+                self.stdout.write(
+                    f"Processed {result['claimed']} message(s): "
+                    f"{result['sent']} sent, {result['failed']} failed"
+                )
+                continue
+
+            if not options['loop']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS('SMS queue drained'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from tithe.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the tithe dashboard rollup tables from TithePayment'
+
+    def handle(self, *args, **options):
+        daily, monthly, ledgers = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {daily} daily and {monthly} member-monthly rollup rows '
+            f'and {ledgers} member ledgers'
+        ))
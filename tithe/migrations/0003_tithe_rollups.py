@@ -0,0 +1,83 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+
+
+def build_rollups(apps, schema_editor):
+    """Fill both rollup tables from the payments recorded so far"""
+    TithePayment = apps.get_model('tithe', 'TithePayment')
+    TitheDailyTotal = apps.get_model('tithe', 'TitheDailyTotal')
+    TitheMemberMonthlyTotal = apps.get_model('tithe', 'TitheMemberMonthlyTotal')
+
+    daily = (
+        TithePayment.objects.annotate(day=TruncDate('date'))
+        .values('day', 'status')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    TitheDailyTotal.objects.bulk_create(
+        [
+            TitheDailyTotal(day=row['day'], status=row['status'],
+                            total_amount=row['total'], payment_count=row['count'])
+            for row in daily.iterator()
+        ],
+        batch_size=1000
+    )
+
+    monthly = (
+        TithePayment.objects.annotate(month=TruncMonth('date', output_field=DateField()))
+        .values('name_id', 'month')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    TitheMemberMonthlyTotal.objects.bulk_create(
+        [
+            TitheMemberMonthlyTotal(name_id=row['name_id'], month=row['month'],
+                                    total_amount=row['total'], payment_count=row['count'])
+            for row in monthly.iterator()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0002_member_phone_e164'),
+        ('tithe', '0002_outboundsms'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitheDailyTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('cash', 'Cash'), ('bank', 'Bank')], max_length=50)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('payment_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-day'],
+                'unique_together': {('day', 'status')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TitheMemberMonthlyTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('payment_count', models.IntegerField(default=0)),
+                ('name', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tithe_monthly_totals', to='member.member', verbose_name='Member')),
+            ],
+            options={
+                'ordering': ['-month'],
+                'unique_together': {('name', 'month')},
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0002_member_phone_e164'),
+        ('tithe', '0003_tithe_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tithepayment',
+            index=models.Index(fields=['date', 'id'], name='tithe_payment_date_id_idx'),
+        ),
+    ]
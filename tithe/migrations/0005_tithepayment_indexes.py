@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0002_member_phone_e164'),
+        ('tithe', '0004_tithepayment_date_id_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tithepayment',
+            index=models.Index(fields=['name', 'date'], name='tithe_payment_member_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tithepayment',
+            index=models.Index(fields=['status', 'date'], name='tithe_payment_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tithepayment',
+            index=models.Index(fields=['sms_sent', 'sms_failure_count'], name='tithe_payment_sms_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:27
+
+from datetime import datetime
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    """Continue each day's numbering after the receipts already issued"""
+    TitheReceipt = apps.get_model('tithe', 'TitheReceipt')
+    ReceiptSequence = apps.get_model('tithe', 'ReceiptSequence')
+
+    last_numbers = {}
+    for receipt_number in TitheReceipt.objects.values_list('receipt_number', flat=True).iterator():
+        try:
+            _, day, number = receipt_number.split('-')
+            day, number = datetime.strptime(day, '%Y%m%d').date(), int(number)
+        except ValueError:
+            continue
+        last_numbers[day] = max(number, last_numbers.get(day, 0))
+
+    ReceiptSequence.objects.bulk_create(
+        ReceiptSequence(day=day, last_number=number) for day, number in last_numbers.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tithe', '0005_tithepayment_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceiptSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('last_number', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+
+def build_ledgers(apps, schema_editor):
+    """One ledger row per member who has paid tithe so far"""
+    TithePayment = apps.get_model('tithe', 'TithePayment')
+    TitheMemberLedger = apps.get_model('tithe', 'TitheMemberLedger')
+
+    ledgers = (
+        TithePayment.objects.values('name_id')
+        .annotate(total=Sum('amount'), count=Count('id'), first=Min('date'), last=Max('date'))
+        .order_by()
+    )
+    TitheMemberLedger.objects.bulk_create(
+        [
+            TitheMemberLedger(name_id=row['name_id'], total_amount=row['total'],
+                              payment_count=row['count'], first_payment_date=row['first'],
+                              last_payment_date=row['last'])
+            for row in ledgers.iterator()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0002_member_phone_e164'),
+        ('tithe', '0006_receiptsequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitheMemberLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('payment_count', models.IntegerField(default=0)),
+                ('first_payment_date', models.DateTimeField(blank=True, null=True)),
+                ('last_payment_date', models.DateTimeField(blank=True, null=True)),
+                ('name', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='tithe_ledger', to='member.member', verbose_name='Member')),
+            ],
+        ),
+        migrations.RunPython(build_ledgers, migrations.RunPython.noop),
+    ]
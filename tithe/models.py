@@ -1,8 +1,32 @@
+from datetime import datetime, time, timedelta
 from django.utils import timezone
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.conf import settings
 from member.models import Member
 from . import sms_service
 
+def day_bounds(start_day, end_day):
+    """
+    [start, end) datetimes covering the local calendar days start_day..end_day.
+    Comparing `date` against these keeps the filter indexable, where a
+    `date__date` lookup casts every row and forces a full scan.
+    """
+    tz = timezone.get_current_timezone()
+    start = datetime.combine(start_day, time.min)
+    end = datetime.combine(end_day + timedelta(days=1), time.min)
+    if settings.USE_TZ:
+        start, end = timezone.make_aware(start, tz), timezone.make_aware(end, tz)
+    return start, end
+
+
+class TithePaymentQuerySet(models.QuerySet):
+    def between_days(self, start_day, end_day):
+        """Payments made on the local days start_day..end_day, inclusive"""
+        start, end = day_bounds(start_day, end_day)
+        return self.filter(date__gte=start, date__lt=end)
+
+
 class TithePayment(models.Model):
     PAYMENT_STATUS_CHOICES = [
         ('cash', 'Cash'),
@@ -26,10 +50,150 @@ class TithePayment(models.Model):
         default='cash'
     )
     
+    objects = TithePaymentQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            # Date ranges, ordering by date and keyset pagination on (date, id)
+            models.Index(fields=['date', 'id'], name='tithe_payment_date_id_idx'),
+            # A member's payment history
+            models.Index(fields=['name', 'date'], name='tithe_payment_member_date_idx'),
+            # Cash/bank breakdowns over a period
+            models.Index(fields=['status', 'date'], name='tithe_payment_status_date_idx'),
+            # Payments whose SMS notification failed
+            models.Index(fields=['sms_sent', 'sms_failure_count'], name='tithe_payment_sms_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.name} - {self.amount} - {self.date.strftime('%Y-%m-%d')}"
 
+
+class TitheDailyTotal(models.Model):
+    """Per-day, per-payment-method rollup of TithePayment, kept current by signals"""
+    day = models.DateField()
+    status = models.CharField(max_length=50, choices=TithePayment.PAYMENT_STATUS_CHOICES)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    payment_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-day']
+        unique_together = ['day', 'status']
+
+    def __str__(self):
+        return f"{self.day} - {self.status} - {self.total_amount}"
+
+
+class TitheMemberMonthlyTotal(models.Model):
+    """Per-member, per-month rollup of TithePayment, kept current by signals"""
+    name = models.ForeignKey(
+        Member,
+        verbose_name="Member",
+        on_delete=models.CASCADE,
+        related_name='tithe_monthly_totals'
+    )
+    month = models.DateField(help_text="First day of the month")
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    payment_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-month']
+        unique_together = ['name', 'month']
+
+    def __str__(self):
+        return f"{self.name} - {self.month.strftime('%Y-%m')} - {self.total_amount}"
+
+
+class TitheMemberLedger(models.Model):
+    """Lifetime giving of one member, kept current by signals"""
+    name = models.OneToOneField(
+        Member,
+        verbose_name="Member",
+        on_delete=models.CASCADE,
+        related_name='tithe_ledger'
+    )
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    payment_count = models.IntegerField(default=0)
+    first_payment_date = models.DateTimeField(null=True, blank=True)
+    last_payment_date = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} - {self.total_amount}"
+
+
+class OutboundSMS(models.Model):
+    """Persistent queue of SMS messages waiting to be delivered by the worker"""
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+
+    tithe_payment = models.ForeignKey(
+        'TithePayment',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='outbound_sms'
+    )
+    phone_number = models.CharField(max_length=20)
+    message = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+
+    # Delivery tracking
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    provider = models.CharField(max_length=50, blank=True, null=True)
+    provider_message_id = models.CharField(max_length=100, blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        verbose_name = "Outbound SMS"
+        verbose_name_plural = "Outbound SMS"
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.phone_number} - {self.get_status_display()}"
+
+
+
+class ReceiptSequence(models.Model):
+    """Last receipt number issued per day; receipt numbers restart at 1 daily"""
+    day = models.DateField(unique=True)
+    last_number = models.PositiveIntegerField(default=0)
     
+    def __str__(self):
+        return f"{self.day}: {self.last_number}"
+    
+    @staticmethod
+    def format_number(day, number):
+        return f"TITH-{day.strftime('%Y%m%d')}-{number:04d}"
+    
+    @classmethod
+    def allocate(cls, count=1, day=None):
+        """
+        Reserve `count` consecutive receipt numbers for `day` (default today)
+        and return them formatted. The counter is bumped with one F()
+        UPDATE, which holds the row lock until the transaction ends, so
+        concurrent clerks never receive the same number.
+        """
+        if count < 1:
+            return []
+        day = day or timezone.localdate()
+        cls.objects.get_or_create(day=day)
+        
+        with transaction.atomic():
+            cls.objects.filter(day=day).update(last_number=F('last_number') + count)
+            last = cls.objects.filter(day=day).values_list('last_number', flat=True).get()
+        
+        return [cls.format_number(day, n) for n in range(last - count + 1, last + 1)]
+
 
 class TitheReceipt(models.Model):
     # Link to existing TithePayment
@@ -66,21 +230,7 @@ class TitheReceipt(models.Model):
     def save(self, *args, **kwargs):
         if not self.receipt_number:
             # Generate receipt number: TITH-YYYYMMDD-0001
-            today = timezone.now().date()
-            last_receipt = TitheReceipt.objects.filter(
-                generated_at__date=today
-            ).order_by('-id').first()
-            
-            if last_receipt and last_receipt.receipt_number:
-                try:
-                    last_number = int(last_receipt.receipt_number.split('-')[-1])
-                    new_number = last_number + 1
-                except (ValueError, IndexError):
-                    new_number = 1
-            else:
-                new_number = 1
-                
-            self.receipt_number = f"TITH-{today.strftime('%Y%m%d')}-{new_number:04d}"
+            self.receipt_number = ReceiptSequence.allocate()[0]
         
         super().save(*args, **kwargs)
     
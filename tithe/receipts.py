@@ -0,0 +1,113 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from .models import TithePayment, TitheReceipt, ReceiptSequence
+
+
+def select_payments(start_day=None, end_day=None, member_id=None, unprinted_only=True):
+    """Payments for a receipt batch: a date range, one member, not yet printed"""
+    payments = TithePayment.objects.all()
+    if start_day and end_day:
+        payments = payments.between_days(start_day, end_day)
+    if member_id:
+        payments = payments.filter(name_id=member_id)
+    if unprinted_only:
+        payments = payments.filter(Q(receipt__isnull=True) | Q(receipt__is_printed=False))
+    return payments
+
+
+def create_missing_receipts(payments, generated_by=None):
+    """
+    Create receipts for every payment in `payments` that has none, in one
+    transaction: one block of numbers from ReceiptSequence and one INSERT.
+
+    Returns:
+        int: Number of receipts created
+    """
+    with transaction.atomic():
+        payment_ids = list(
+            payments.filter(receipt__isnull=True)
+            .order_by('date', 'id')
+            .values_list('id', flat=True)
+        )
+        numbers = ReceiptSequence.allocate(len(payment_ids))
+        # A receipt created concurrently for the same payment is skipped;
+        # its reserved number is simply left unused
+        TitheReceipt.objects.bulk_create(
+            [
+                TitheReceipt(tithe_payment_id=payment_id, receipt_number=number, generated_by=generated_by)
+                for payment_id, number in zip(payment_ids, numbers)
+            ],
+            ignore_conflicts=True,
+        )
+        # The numbers were reserved for this call alone, so the receipts
+        # holding them are exactly the ones inserted here
+        return TitheReceipt.objects.filter(receipt_number__in=numbers).count()
+
+
+def receipts_for(payments):
+    """Receipts of `payments` in payment order, with payment and member joined"""
+    return (
+        TitheReceipt.objects.filter(tithe_payment__in=payments.values('id'))
+        .select_related('tithe_payment__name')
+        .order_by('tithe_payment__date', 'id')
+    )
+
+
+def mark_printed(receipt_ids):
+    """Bulk equivalent of TitheReceipt.mark_printed"""
+    return TitheReceipt.objects.filter(id__in=receipt_ids).update(
+        is_printed=True,
+        printed_at=timezone.now(),
+        print_attempts=F('print_attempts') + 1,
+    )
+
+
+def _document_key(receipt_number):
+    return f'tithe-receipt-document:{receipt_number}'
+
+
+def get_receipt_document(receipt_number):
+    """
+    The printable HTML of a receipt, rendered once and then served from the
+    cache until its payment or member changes.
+
+    Returns:
+        dict: `content` (bytes), `etag` and `last_modified` (epoch seconds),
+        or None if there is no such receipt
+    """
+    key = _document_key(receipt_number)
+    document = cache.get(key)
+    if document is not None:
+        return document
+
+    receipt = (
+        TitheReceipt.objects.select_related('tithe_payment__name')
+        .filter(receipt_number=receipt_number).first()
+    )
+    if receipt is None:
+        return None
+
+    content = render_to_string('tithepayment/receipt_document.html', {
+        'receipt': receipt,
+        'payment': receipt.tithe_payment,
+    }).encode()
+    document = {
+        'content': content,
+        'etag': '"%s"' % hashlib.md5(content).hexdigest(),
+        'last_modified': int(time.time()),
+    }
+    cache.set(key, document, getattr(settings, 'RECEIPT_CACHE_TIMEOUT', 60 * 60 * 24))
+    return document
+
+
+def invalidate_receipt_documents(receipts):
+    """Drop the cached documents of the given receipts (a queryset or numbers)"""
+    if hasattr(receipts, 'values_list'):
+        receipts = receipts.values_list('receipt_number', flat=True)
+    cache.delete_many([_document_key(number) for number in receipts])
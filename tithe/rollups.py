@@ -0,0 +1,195 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.apps import apps as django_apps
+from django.db import IntegrityError, transaction
+from django.db.models import Case, DateField, F, Max, Min, Q, Subquery, Sum, Count, Value, When
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+
+def payment_buckets(date, status, member_id):
+    """Rollup keys a payment falls into: (daily lookup, member monthly lookup)"""
+    day = timezone.localdate(date) if timezone.is_aware(date) else date.date()
+    return (
+        {'day': day, 'status': status},
+        {'name_id': member_id, 'month': day.replace(day=1)},
+    )
+
+
+def _increment(model, lookup, amount, count, extra_updates=None, extra_fields=None):
+    updates = {
+        'total_amount': F('total_amount') + amount,
+        'payment_count': F('payment_count') + count,
+        **(extra_updates or {}),
+    }
+    if model.objects.filter(**lookup).update(**updates):
+        if count < 0:
+            model.objects.filter(payment_count__lte=0, **lookup).delete()
+        return
+    if count < 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(total_amount=amount, payment_count=count, **lookup, **(extra_fields or {}))
+    except IntegrityError:
+        # Another request created the bucket first
+        model.objects.filter(**lookup).update(**updates)
+
+
+def _add_to_ledger(member_id, first_date, last_date, amount, count):
+    from .models import TitheMemberLedger
+
+    # Widen the first/last payment dates in the same UPDATE
+    _increment(TitheMemberLedger, {'name_id': member_id}, amount, count, extra_updates={
+        'first_payment_date': Case(
+            When(first_payment_date__lte=first_date, then=F('first_payment_date')), default=Value(first_date)
+        ),
+        'last_payment_date': Case(
+            When(last_payment_date__gte=last_date, then=F('last_payment_date')), default=Value(last_date)
+        ),
+    }, extra_fields={'first_payment_date': first_date, 'last_payment_date': last_date})
+
+
+def _apply_to_ledger(member_id, date, amount, sign):
+    from .models import TithePayment, TitheMemberLedger
+
+    if sign > 0:
+        _add_to_ledger(member_id, date, date, amount, sign)
+        return
+
+    lookup = {'name_id': member_id}
+    _increment(TitheMemberLedger, lookup, amount, sign)
+    # Only removing the earliest or latest payment moves a bound; re-read it
+    # from the (name, date) index
+    payments = TithePayment.objects.filter(name_id=member_id)
+    TitheMemberLedger.objects.filter(
+        Q(first_payment_date=date) | Q(last_payment_date=date), **lookup
+    ).update(
+        first_payment_date=Subquery(payments.order_by('date').values('date')[:1]),
+        last_payment_date=Subquery(payments.order_by('-date').values('date')[:1]),
+    )
+
+
+def apply_payment(date, status, member_id, amount, sign=1):
+    """Add (sign=1) or remove (sign=-1) one payment from every rollup"""
+    from .models import TitheDailyTotal, TitheMemberMonthlyTotal
+
+    daily, monthly = payment_buckets(date, status, member_id)
+    # amount may still be the raw string posted to quick_add_tithe_payment
+    amount = Decimal(str(amount)) * sign
+    _increment(TitheDailyTotal, daily, amount, sign)
+    _increment(TitheMemberMonthlyTotal, monthly, amount, sign)
+    _apply_to_ledger(member_id, date, amount, sign)
+
+
+def apply_new_payments(payments):
+    """
+    Add many new payments to the rollups with one update per bucket rather
+    than per payment. Used after bulk_create, which skips the signals.
+    """
+    from .models import TitheDailyTotal, TitheMemberMonthlyTotal
+
+    daily = defaultdict(lambda: [Decimal('0'), 0])
+    monthly = defaultdict(lambda: [Decimal('0'), 0])
+    ledgers = {}
+
+    for payment in payments:
+        day, month = payment_buckets(payment.date, payment.status, payment.name_id)
+        amount = Decimal(str(payment.amount))
+        for totals, key in ((daily, tuple(day.items())), (monthly, tuple(month.items()))):
+            totals[key][0] += amount
+            totals[key][1] += 1
+
+        first, last, total, count = ledgers.get(payment.name_id, (payment.date, payment.date, Decimal('0'), 0))
+        ledgers[payment.name_id] = (min(first, payment.date), max(last, payment.date), total + amount, count + 1)
+
+    for model, totals in ((TitheDailyTotal, daily), (TitheMemberMonthlyTotal, monthly)):
+        for key, (amount, count) in totals.items():
+            _increment(model, dict(key), amount, count)
+    for member_id, (first, last, amount, count) in ledgers.items():
+        _add_to_ledger(member_id, first, last, amount, count)
+
+
+def rebuild_daily_totals(apps=None):
+    apps = apps or django_apps
+    TithePayment = apps.get_model('tithe', 'TithePayment')
+    TitheDailyTotal = apps.get_model('tithe', 'TitheDailyTotal')
+
+    TitheDailyTotal.objects.all().delete()
+    daily = (
+        TithePayment.objects.annotate(day=TruncDate('date'))
+        .values('day', 'status')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    created = TitheDailyTotal.objects.bulk_create(
+        [
+            TitheDailyTotal(day=row['day'], status=row['status'],
+                            total_amount=row['total'], payment_count=row['count'])
+            for row in daily.iterator()
+        ],
+        batch_size=1000
+    )
+    return len(created)
+
+
+def rebuild_member_monthly_totals(apps=None):
+    apps = apps or django_apps
+    TithePayment = apps.get_model('tithe', 'TithePayment')
+    TitheMemberMonthlyTotal = apps.get_model('tithe', 'TitheMemberMonthlyTotal')
+
+    TitheMemberMonthlyTotal.objects.all().delete()
+    monthly = (
+        TithePayment.objects.annotate(month=TruncMonth('date', output_field=DateField()))
+        .values('name_id', 'month')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    created = TitheMemberMonthlyTotal.objects.bulk_create(
+        [
+            TitheMemberMonthlyTotal(name_id=row['name_id'], month=row['month'],
+                                    total_amount=row['total'], payment_count=row['count'])
+            for row in monthly.iterator()
+        ],
+        batch_size=1000
+    )
+    return len(created)
+
+
+def rebuild_member_ledgers(apps=None):
+    apps = apps or django_apps
+    TithePayment = apps.get_model('tithe', 'TithePayment')
+    TitheMemberLedger = apps.get_model('tithe', 'TitheMemberLedger')
+
+    TitheMemberLedger.objects.all().delete()
+    ledgers = (
+        TithePayment.objects.values('name_id')
+        .annotate(total=Sum('amount'), count=Count('id'), first=Min('date'), last=Max('date'))
+        .order_by()
+    )
+    created = TitheMemberLedger.objects.bulk_create(
+        [
+            TitheMemberLedger(name_id=row['name_id'], total_amount=row['total'],
+                              payment_count=row['count'], first_payment_date=row['first'],
+                              last_payment_date=row['last'])
+            for row in ledgers.iterator()
+        ],
+        batch_size=1000
+    )
+    return len(created)
+
+
+def rebuild_rollups(apps=None):
+    """
+    Recompute every rollup from TithePayment. `apps` is the app registry
+    to load the models from, the live one by default.
+
+    Returns:
+        tuple: Rows written to the daily, member-monthly and ledger tables
+    """
+    with transaction.atomic():
+        return (
+            rebuild_daily_totals(apps),
+            rebuild_member_monthly_totals(apps),
+            rebuild_member_ledgers(apps),
+        )
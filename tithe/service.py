@@ -1,22 +1,162 @@
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from .dispatch import dispatch, get_rate_limiter
 from .sms_api.africastalking import AfricaTalkingProvider
-from .sms_api.BeemAfrica import BeemAfrica
+from .sms_api.nextsms import NextSMSProvider
+from .sms_api.BeemAfrica import BeemAfricaProvider
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Provider name -> factory building the provider from settings
+PROVIDER_REGISTRY = {}
+
+
+def register_provider(name):
+    """Decorator registering a provider factory under `name` for SMS_PROVIDERS"""
+    def decorator(factory):
+        PROVIDER_REGISTRY[name] = factory
+        return factory
+    return decorator
+
+
+def _required_setting(name):
+    value = getattr(settings, name, None)
+    if not value:
+        raise ImproperlyConfigured(f"{name} is not set")
+    return value
+
+
+@register_provider('africastalking')
+def _africastalking():
+    return AfricaTalkingProvider(
+        username=getattr(settings, 'AFRICASTALKING_USERNAME', None) or 'sandbox', # Uses 'sandbox' if setting is missing
+        api_key=_required_setting('AFRICASTALKING_API_KEY'),
+        sender_id=getattr(settings, 'AFRICASTALKING_SENDER_ID', None)
+    )
+
+
+@register_provider('nextsms')
+def _nextsms():
+    return NextSMSProvider(
+        api_key=_required_setting('NEXTSMS_API_KEY'),
+        api_secret=_required_setting('NEXTSMS_API_SECRET'),
+        sender_id=_required_setting('NEXTSMS_SENDER_ID')
+    )
+
+
+@register_provider('beemafrica')
+def _beemafrica():
+    return BeemAfricaProvider(
+        api_key=_required_setting('BEEM_API_KEY'),
+        secret_key=_required_setting('BEEM_SECRET_KEY'),
+        sender_id=getattr(settings, 'BEEM_SENDER_NAME', None)
+    )
+
+
 class SMSService:
-    def __init__(self):
-        # Default provider is Africa's Talking
-        self.provider = AfricaTalkingProvider(
-            username=getattr(settings, 'AFRICASTALKING_USERNAME', 'sandbox'), # Uses 'sandbox' if setting is missing
-            api_key=getattr(settings, 'AFRICASTALKING_API_KEY', ''),          # Uses '' if setting is missing
-            sender_id=getattr(settings, 'AFRICASTALKING_SENDER_ID', None)
+    """
+    Sends through the providers listed in SMS_PROVIDERS, in order. When a
+    provider fails, the affected recipients are retried on the next one.
+    """
+
+    def __init__(self, provider_names=None):
+        self.provider_names = provider_names or getattr(settings, 'SMS_PROVIDERS', ['africastalking'])
+        self._providers = None
+
+    @property
+    def providers(self):
+        # Built lazily so a missing credential doesn't break imports
+        if self._providers is None:
+            providers = []
+            for name in self.provider_names:
+                try:
+                    providers.append(PROVIDER_REGISTRY[name]())
+                except KeyError:
+                    logger.error("Unknown SMS provider %r in SMS_PROVIDERS", name)
+                except ImproperlyConfigured as e:
+                    logger.warning("SMS provider %s skipped: %s", name, e)
+            self._providers = providers
+            logger.info("SMSService initialized using %s", [p.name for p in providers])
+        return self._providers
+
+    def send_sms(self, phone_number, message, rate_limit=False):
+        """
+        Send through the first provider that succeeds. With `rate_limit`,
+        every attempt waits for a slot of the provider it goes through.
+        """
+        result = {'success': False, 'error': 'No SMS provider configured'}
+        for provider in self.providers:
+            if rate_limit:
+                get_rate_limiter(provider.name).wait()
+            result = provider.send_sms(phone_number, message)
+            if result.get('success'):
+                break
+            logger.warning("SMS via %s failed (%s), trying next provider", provider.name, result.get('error'))
+        return result
+
+    def send_bulk_sms(self, phone_numbers, message, rate_limit=False):
+        """
+        Send one message to many numbers with each provider's native batch
+        API. Returns the BaseSMSProvider.send_bulk_sms result shape, with
+        `recipients` merged across the providers that were tried. With
+        `rate_limit`, every request waits for a slot of the provider it
+        goes to.
+        """
+        if not self.providers:
+            return {'success': False, 'error': 'No SMS provider configured'}
+
+        recipients = {}
+        remaining = list(phone_numbers)
+        result = {}
+
+        for provider in self.providers:
+            if rate_limit:
+                get_rate_limiter(provider.name).wait()
+            result = provider.send_bulk_sms(remaining, message)
+            if result.get('success'):
+                for recipient in result['recipients']:
+                    recipient['provider'] = provider.name
+                    recipients[recipient['phone_number']] = recipient
+                # A number the provider left out of its response counts as failed
+                remaining = [p for p in remaining if not recipients.get(p, {}).get('success')]
+            else:
+                logger.warning("Bulk SMS via %s failed (%s)", provider.name, result.get('error'))
+
+            if not remaining:
+                break
+
+        if not recipients:
+            # Every provider rejected the request outright
+            return result
+
+        return {
+            'success': True,
+            'recipients': [
+                recipients.get(p) or {
+                    'phone_number': p, 'success': False,
+                    'status': 'Failed', 'error': result.get('error')
+                }
+                for p in phone_numbers
+            ],
+            'provider': ','.join(dict.fromkeys(r['provider'] for r in recipients.values()))
+        }
+
+    def send_many(self, messages, max_in_flight=None):
+        """
+        Send (phone_number, message) pairs concurrently, with failover. Rate
+        limits apply per attempt, to the provider that actually sends it.
+        """
+        return dispatch(
+            lambda item: self.send_sms(*item, rate_limit=True),
+            messages,
+            provider_name=None,
+            max_in_flight=max_in_flight
         )
-        logger.info(f"SMSService initialized using {self.provider.__class__.__name__}")
-    
-    def send_sms(self, phone_number, message):
-        return self.provider.send_sms(phone_number, message)
+
+    def get_balance(self):
+        """Balance of every configured provider, keyed by provider name"""
+        return {provider.name: provider.get_balance() for provider in self.providers}
 
 # Global instance
 sms_service = SMSService()
@@ -1,11 +1,14 @@
 import re
 import logging
-from django.db.models.signals import post_save
+from decimal import Decimal
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.conf import settings
-from django.utils import timezone
-from .models import TithePayment
-from .sms_service import sms_service 
+from member.models import Member
+from .models import TithePayment, TitheReceipt
+from .sms_queue import enqueue_sms
+from .rollups import apply_payment
+from .receipts import invalidate_receipt_documents
 
 logger = logging.getLogger(__name__)
 
@@ -29,11 +32,33 @@ def format_phone_number(phone):
          return '+' + cleaned
     return phone
 
+def build_tithe_message(payment):
+    """Thank-you message sent to the member after a tithe is recorded"""
+    # Fetch member name from related model or default to 'Mpendwa'
+    member_name = payment.name.name if hasattr(payment.name, 'name') else "Mpendwa"
+    # amount may still be the raw string posted to quick_add_tithe_payment
+    formatted_amount = "{:,}".format(Decimal(str(payment.amount)))
+
+    return (
+        f"Bwana Yesu Asifiwe {member_name}, tunakushukuru kwa zaka yako ya "
+        f"Tsh {formatted_amount} imepokelewa. Malaki 3:10. Ubarikiwe sana!"
+    )
+
+def tithe_sms_for(payment):
+    """(phone_number, message) for a payment's thank-you SMS, or None without a number"""
+    raw_phone = getattr(payment, 'contact_number', None)
+    if not raw_phone:
+        return None
+    # Prefer the member's stored E.164 number over re-parsing the raw value
+    phone_number = getattr(payment.name, 'phone_e164', None) or format_phone_number(raw_phone)
+    return phone_number, build_tithe_message(payment)
+
 @receiver(post_save, sender=TithePayment)
 def send_tithe_sms_notification(sender, instance, created, **kwargs):
     """
-    Signal to send SMS via Africa's Talking when a TithePayment is recorded,
-    and update the instance fields with the SMS result.
+    Signal to queue a thank-you SMS when a TithePayment is recorded.
+    Delivery and the write-back to the sms_* fields happen in the
+    process_sms_queue worker, so saving a payment never waits on the gateway.
     """
     # 1. Feature Toggle & Only act on creation
     if not getattr(settings, 'SEND_SMS_ENABLED', False) or not created:
@@ -41,46 +66,60 @@ def send_tithe_sms_notification(sender, instance, created, **kwargs):
 
     try:
         # 2. Validate Contact Number
-        raw_phone = getattr(instance, 'contact_number', None)
-        if not raw_phone:
+        sms = tithe_sms_for(instance)
+        if sms is None:
             logger.warning(f"Tithe ID {instance.id}: No contact number provided.")
             return
-        
-        phone_number = format_phone_number(raw_phone)
-        
-        # 3. Data Preparation
-        # Fetch member name from related model or default to 'Mpendwa'
-        member_name = instance.name.name if hasattr(instance.name, 'name') else "Mpendwa"
-        formatted_amount = "{:,}".format(instance.amount)
-        
-        message = (
-            f"Bwana Yesu Asifiwe {member_name}, tunakushukuru kwa zaka yako ya "
-            f"Tsh {formatted_amount} imepokelewa. Malaki 3:10. Ubarikiwe sana!"
-        )
-
-        # 4. Dispatch SMS
-        result = sms_service.send_sms(phone_number, message)
-        
-        # 5. CRITICAL FIX: Update the model instance fields with the result
-        instance.sms_sent_at = timezone.now()
-        instance.sms_message_id = result.get('message_id')
-
-        if result.get('success'):
-            instance.sms_sent = True
-            instance.last_sms_error = None
-            logger.info(f"SMS SUCCESS: ID {instance.id} via {result.get('provider')}")
-        else:
-            instance.sms_sent = False
-            instance.sms_failure_count += 1
-            instance.last_sms_error = result.get('error')
-            logger.error(f"SMS FAILURE: ID {instance.id} | Error: {result.get('error')}")
-
-        # 6. CRITICAL FIX: Save the instance again using update_fields 
-        # This prevents the post_save signal from running in an infinite loop
-        instance.save(update_fields=[
-            'sms_sent', 'sms_sent_at', 'sms_message_id', 
-            'sms_failure_count', 'last_sms_error'
-        ])
-            
+
+        # 3. Queue the message for the worker
+        phone_number, message = sms
+        enqueue_sms(phone_number, message, tithe_payment=instance)
+
     except Exception as e:
         logger.error(f"CRITICAL SIGNAL ERROR for Tithe ID {instance.id}: {str(e)}", exc_info=True)
+
+
+# Fields that move a payment between rollup buckets
+ROLLUP_FIELDS = ('date', 'status', 'name_id', 'amount')
+
+@receiver(pre_save, sender=TithePayment)
+def remember_rollup_values(sender, instance, update_fields=None, **kwargs):
+    """Keep the stored values so post_save can move the payment between buckets"""
+    instance._rollup_previous = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and not {'date', 'status', 'name', 'name_id', 'amount'} & set(update_fields):
+        return
+    instance._rollup_previous = (
+        TithePayment.objects.filter(pk=instance.pk).values(*ROLLUP_FIELDS).first()
+    )
+
+@receiver(post_save, sender=TithePayment)
+def update_tithe_rollups(sender, instance, created, update_fields=None, **kwargs):
+    """Keep TitheDailyTotal and TitheMemberMonthlyTotal current"""
+    previous = getattr(instance, '_rollup_previous', None)
+    if not created and previous is None:
+        return
+
+    if previous is not None:
+        if all(previous[f] == getattr(instance, f) for f in ROLLUP_FIELDS):
+            return
+        apply_payment(previous['date'], previous['status'], previous['name_id'], previous['amount'], sign=-1)
+
+    apply_payment(instance.date, instance.status, instance.name_id, instance.amount)
+
+@receiver(post_delete, sender=TithePayment)
+def remove_from_tithe_rollups(sender, instance, **kwargs):
+    apply_payment(instance.date, instance.status, instance.name_id, instance.amount, sign=-1)
+
+@receiver(post_save, sender=TithePayment)
+def invalidate_payment_receipt(sender, instance, created, **kwargs):
+    """A cached receipt document must reflect the edited payment"""
+    if not created:
+        invalidate_receipt_documents(TitheReceipt.objects.filter(tithe_payment=instance))
+
+@receiver(post_save, sender=Member)
+def invalidate_member_receipts(sender, instance, created, **kwargs):
+    """Receipts show the member's name, so renaming them stales the cache"""
+    if not created:
+        invalidate_receipt_documents(TitheReceipt.objects.filter(tithe_payment__name=instance))
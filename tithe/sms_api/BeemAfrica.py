@@ -1,36 +1,97 @@
-import BeemAfrica  
+from typing import Dict, Any
 from ..base import BaseSMSProvider
+from ..http_session import get_session, get_timeout
 
 class BeemAfricaProvider(BaseSMSProvider):
-    def __init__(self, api_key, secret_key, sender_id=None):
-        # Use the official client initialization
-        self.client = BeemAfrica.SMS(api_key=api_key, secret_key=secret_key)
+    name = 'beemafrica'
+
+    def __init__(self, api_key, secret_key, sender_id=None,
+                 base_url="https://apisms.beem.africa"):
+        # Beem's REST API is called directly with Basic auth (api_key:secret_key)
+        # over a pooled keep-alive session
+        self.session = get_session(f"{self.name}:{api_key}", auth=(api_key, secret_key))
         self.sender_id = sender_id
+        self.base_url = base_url
         super().__init__()
     
     def send_sms(self, phone_number, message):
+        result = self.send_bulk_sms([phone_number], message)
+        if not result['success']:
+            return result
+
+        recipient = result['recipients'][0]
+        return {
+            'success': recipient['success'],
+            'message_id': recipient.get('message_id'),
+            'error': recipient.get('error'),
+            'data': result['data'],
+            'provider': self.name
+        }
+
+    def send_bulk_sms(self, phone_numbers: list, message: str) -> Dict[str, Any]:
+        """
+        One /v1/send request for all numbers. Beem only reports a request-level
+        result, so every recipient shares it.
+        """
+        cleaned = {p: ''.join(filter(str.isdigit, str(p))) for p in phone_numbers}
+        payload = {
+            'source_addr': self.sender_id,
+            'encoding': 0,
+            'message': message,
+            'recipients': [
+                {'recipient_id': i, 'dest_addr': dest}
+                for i, dest in enumerate(dict.fromkeys(cleaned.values()), start=1)
+            ]
+        }
+
         try:
-            # Correct method call and parameter names
-            response = self.client.send_sms(
-                message=message,
-                recipients=phone_number,  # Accepts string or list
-                sender_id=self.sender_id
+            response = self.session.post(
+                f"{self.base_url}/v1/send",
+                json=payload,
+                timeout=get_timeout()
             )
-            
-            # Beem Africa response usually contains a 'successful' boolean
-            if response.get('successful'):
-                return {
+            response_data = response.json()
+        except Exception as e:
+            return {'success': False, 'error': str(e), 'provider': self.name}
+
+        # Beem Africa response contains a 'successful' boolean
+        if not response_data.get('successful'):
+            return {
+                'success': False,
+                'error': response_data.get('message', 'Unknown Error'),
+                'data': response_data,
+                'provider': self.name
+            }
+
+        return {
+            'success': True,
+            'recipients': [
+                {
+                    'phone_number': p,
                     'success': True,
-                    'message_id': response.get('request_id'),
-                    'data': response,
-                    'provider': 'beemafrica'
-                }
-            else:
-                return {
-                    'success': False, 
-                    'error': response.get('message', 'Unknown Error'),
-                    'data': response
+                    'status': response_data.get('message'),
+                    'message_id': response_data.get('request_id'),
+                    'cost': None,
+                    'error': None
                 }
-                
+                for p in phone_numbers
+            ],
+            'data': response_data,
+            'provider': self.name
+        }
+
+    def get_balance(self) -> Dict[str, Any]:
+        try:
+            response = self.session.get(
+                f"{self.base_url}/public/v1/vendors/balance",
+                timeout=get_timeout()
+            )
+            response_data = response.json()
+            return {
+                'success': response.status_code == 200,
+                'balance': response_data.get('data', {}).get('credit_balance'),
+                'data': response_data,
+                'provider': self.name
+            }
         except Exception as e:
-            return {'success': False, 'error': str(e)}
+            return {'success': False, 'error': str(e), 'provider': self.name}
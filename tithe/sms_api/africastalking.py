@@ -1,37 +1,125 @@
-import africastalking
+from africastalking.Service import validate_phone
 from ..base import BaseSMSProvider
+from ..http_session import get_session, get_timeout
 
 class AfricaTalkingProvider(BaseSMSProvider):
+    name = 'africastalking'
+
     def __init__(self, username, api_key, sender_id=None):
         # In 2026, ensure username is 'sandbox' for testing
-        africastalking.initialize(username, api_key)
-        self.sms = africastalking.SMS
+        # The REST API is called directly: the SDK opens a new connection
+        # per request, while this pooled session keeps the TLS link alive
+        self.username = username
         self.sender_id = sender_id
-    
+        domain = 'sandbox.africastalking.com' if username == 'sandbox' else 'africastalking.com'
+        self.base_url = f"https://api.{domain}/version1"
+        self.session = get_session(
+            f"{self.name}:{username}",
+            headers={'apiKey': api_key, 'Accept': 'application/json'}
+        )
+
     def send_sms(self, phone_number, message):
-        try:
-            # FIX 1: Ensure phone_number is wrapped in a list
-            # FIX 2: Use 'sender_id' instead of 'from_'
-            params = {
-                'message': message,
-                'recipients': [phone_number] 
+        result = self.send_bulk_sms([phone_number], message)
+        if not result['success']:
+            return result
+
+        recipient = result['recipients'][0]
+        return {
+            'success': recipient['success'],
+            'message_id': recipient.get('message_id'),
+            'error': recipient.get('error'),
+            'data': result['data'],
+            'provider': self.name
+        }
+
+    def send_bulk_sms(self, phone_numbers, message):
+        """
+        One /messaging request for all `phone_numbers`; the response's
+        `Recipients` array is mapped back onto the numbers as given.
+        """
+        # The SDK rejects the whole request if one number is malformed
+        valid = [p for p in phone_numbers if validate_phone(p)]
+        recipients = {
+            p: {'phone_number': p, 'success': False, 'status': 'InvalidPhoneNumber',
+                'error': 'Phone number must be in international format (e.g., +255...)'}
+            for p in phone_numbers if p not in valid
+        }
+
+        if not valid:
+            return {
+                'success': True,
+                'recipients': [recipients[p] for p in phone_numbers],
+                'data': None,
+                'provider': self.name
             }
-            
-            if self.sender_id:
-                params['from_'] = self.sender_id
-                
-            # The SDK method signature is: send(message, recipients, sender_id=None)
-            response = self.sms.send(**params)
-            
-            if response['SMSMessageData']['Recipients']:
-                recipient = response['SMSMessageData']['Recipients'][0]
-                # Status "Success" is case-sensitive in some SDK versions
-                return {
-                    'success': recipient['status'].lower() == 'success',
-                    'message_id': recipient.get('messageId'),
-                    'data': response,
-                    'provider': 'africastalking'
+
+        data = {
+            'username': self.username,
+            'to': ','.join(valid),
+            'message': message,
+            'bulkSMSMode': 1,
+        }
+        if self.sender_id:
+            data['from'] = self.sender_id
+
+        try:
+            http_response = self.session.post(
+                f"{self.base_url}/messaging", data=data, timeout=get_timeout()
+            )
+            http_response.raise_for_status()
+            response = http_response.json()
+        except Exception as e:
+            return {'success': False, 'error': str(e), 'provider': self.name}
+
+        try:
+            by_number = {r.get('number'): r for r in response['SMSMessageData']['Recipients']}
+        except (KeyError, TypeError, AttributeError):
+            # An error payload has no recipient list: fail the whole request
+            # so the service can retry every number on the next provider
+            return {'success': False, 'error': f"Unexpected response: {response}", 'provider': self.name}
+
+        for phone_number in valid:
+            info = by_number.get(phone_number)
+            if info is None:
+                recipients[phone_number] = {
+                    'phone_number': phone_number, 'success': False,
+                    'status': 'Unknown', 'error': 'No recipient data returned'
                 }
-            return {'success': False, 'error': 'No recipients'}
+                continue
+
+            # Status "Success" is case-sensitive in some SDK versions
+            status = info.get('status', 'Unknown')
+            success = status.lower() in ['success', 'sent']
+            recipients[phone_number] = {
+                'phone_number': phone_number,
+                'success': success,
+                'status': status,
+                'message_id': info.get('messageId'),
+                'cost': info.get('cost'),
+                'error': None if success else status
+            }
+
+        return {
+            'success': True,
+            'recipients': [recipients[p] for p in phone_numbers],
+            'data': response,
+            'provider': self.name
+        }
+
+    def get_balance(self):
+        try:
+            http_response = self.session.get(
+                f"{self.base_url}/user",
+                params={'username': self.username},
+                timeout=get_timeout()
+            )
+            http_response.raise_for_status()
+            response = http_response.json()
+            return {
+                'success': True,
+                'balance': response.get('UserData', {}).get('balance'),
+                'data': response,
+                'provider': self.name
+            }
         except Exception as e:
-            return {'success': False, 'error': str(e), 'provider': 'africastalking'}
\ No newline at end of file
+            return {'success': False, 'error': str(e), 'provider': self.name}
\ No newline at end of file
@@ -2,13 +2,18 @@ import requests
 import base64
 from typing import Dict, Any
 from ..base import BaseSMSProvider
+from ..http_session import get_session, get_timeout
 
 class NextSMSProvider(BaseSMSProvider):
+    name = 'nextsms'
+
     def __init__(self, api_key: str, api_secret: str, sender_id: str, base_url: str = "https://apigw.nextsms.com"):
         self.api_key = api_key
         self.api_secret = api_secret  
         self.sender_id = sender_id
         self.base_url = base_url
+        # Pooled keep-alive session with the auth header encoded once
+        self.session = get_session(f"{self.name}:{api_key}", headers=self._get_auth_header())
     
     def _get_auth_header(self):
         # Option 1: Basic Auth (Most common for NextSMS)
@@ -38,12 +43,10 @@ class NextSMSProvider(BaseSMSProvider):
         }
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 url, 
                 json=payload, 
-                headers=self._get_auth_header(), 
-                timeout=30,
-                verify=True  # Important for production
+                timeout=get_timeout()
             )
             response_data = response.json()
             
@@ -77,10 +80,78 @@ class NextSMSProvider(BaseSMSProvider):
                 'provider': 'nextsms'
             }
     
-    def send_bulk_sms(self, recipients: list) -> Dict[str, Any]:
-        # Implementation for bulk SMS
-        # NextSMS bulk endpoint is usually: /api/sms/v1/text/multi
-        pass
+    # Infobip-style status groups reported by NextSMS for rejected messages
+    FAILED_STATUS_GROUPS = ('REJECTED', 'UNDELIVERABLE', 'EXPIRED')
+    
+    def send_bulk_sms(self, phone_numbers: list, message: str) -> Dict[str, Any]:
+        url = f"{self.base_url}/api/sms/v1/text/multi"
+        
+        cleaned = {phone_number: self._clean_phone_number(phone_number) for phone_number in phone_numbers}
+        payload = {
+            "messages": [
+                {"from": self.sender_id, "to": to, "text": message}
+                for to in dict.fromkeys(cleaned.values())
+            ]
+        }
+        
+        try:
+            response = self.session.post(
+                url, 
+                json=payload, 
+                timeout=get_timeout()
+            )
+            response_data = response.json()
+        except requests.exceptions.RequestException as e:
+            return {
+                'success': False,
+                'error': f"Network error: {str(e)}",
+                'provider': 'nextsms'
+            }
+        except ValueError as e:  # JSON decode error
+            return {
+                'success': False,
+                'error': f"Invalid response: {str(e)}",
+                'provider': 'nextsms'
+            }
+        
+        if response.status_code not in [200, 201]:
+            return {
+                'success': False,
+                'error': f"HTTP {response.status_code}: {response_data}",
+                'data': response_data,
+                'status_code': response.status_code,
+                'provider': 'nextsms'
+            }
+        
+        by_number = {m.get('to'): m for m in response_data.get('messages', [])}
+        recipients = []
+        for phone_number in phone_numbers:
+            info = by_number.get(cleaned[phone_number])
+            if info is None:
+                recipients.append({
+                    'phone_number': phone_number, 'success': False,
+                    'status': 'Unknown', 'error': 'No recipient data returned'
+                })
+                continue
+            
+            status = info.get('status') or {}
+            success = status.get('groupName') not in self.FAILED_STATUS_GROUPS
+            recipients.append({
+                'phone_number': phone_number,
+                'success': success,
+                'status': status.get('name') or status.get('groupName'),
+                'message_id': info.get('messageId'),
+                'cost': info.get('smsCount'),
+                'error': None if success else status.get('description')
+            })
+        
+        return {
+            'success': True,
+            'recipients': recipients,
+            'data': response_data,
+            'status_code': response.status_code,
+            'provider': 'nextsms'
+        }
     
     def get_balance(self) -> Dict[str, Any]:
         # Implementation for balance check
@@ -88,10 +159,9 @@ class NextSMSProvider(BaseSMSProvider):
         url = f"{self.base_url}/api/v1/balance"
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 url,
-                headers=self._get_auth_header(),
-                timeout=30
+                timeout=get_timeout()
             )
             response_data = response.json()
             
@@ -99,12 +169,14 @@ class NextSMSProvider(BaseSMSProvider):
                 'success': response.status_code == 200,
                 'balance': response_data.get('balance'),
                 'data': response_data,
-                'status_code': response.status_code
+                'status_code': response.status_code,
+                'provider': 'nextsms'
             }
         except Exception as e:
             return {
                 'success': False,
-                'error': str(e)
+                'error': str(e),
+                'provider': 'nextsms'
             }
     
     def _clean_phone_number(self, phone_number: str) -> str:
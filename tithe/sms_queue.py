@@ -0,0 +1,148 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import OutboundSMS, TithePayment
+from .service import sms_service
+
+logger = logging.getLogger(__name__)
+
+
+def _queue_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue_sms(phone_number, message, tithe_payment=None):
+    """Add a message to the outbound queue; the worker delivers it later"""
+    return OutboundSMS.objects.create(
+        tithe_payment=tithe_payment,
+        phone_number=phone_number,
+        message=message,
+        max_attempts=_queue_setting('SMS_QUEUE_MAX_ATTEMPTS', 5),
+    )
+
+
+def enqueue_many(messages):
+    """
+    Queue (phone_number, message, tithe_payment) triples with one INSERT.
+
+    Returns:
+        list: The created OutboundSMS rows
+    """
+    max_attempts = _queue_setting('SMS_QUEUE_MAX_ATTEMPTS', 5)
+    return OutboundSMS.objects.bulk_create(
+        [
+            OutboundSMS(tithe_payment=payment, phone_number=phone_number,
+                        message=message, max_attempts=max_attempts)
+            for phone_number, message, payment in messages
+        ],
+        batch_size=500
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2x base, 4x base ... capped at SMS_QUEUE_MAX_BACKOFF"""
+    base = _queue_setting('SMS_QUEUE_RETRY_BACKOFF', 60)
+    cap = _queue_setting('SMS_QUEUE_MAX_BACKOFF', 3600)
+    return timedelta(seconds=min(base * (2 ** max(attempts - 1, 0)), cap))
+
+
+def claim_batch(batch_size=None):
+    """
+    Lock and mark a batch of due messages as SENDING so that concurrent
+    workers never pick up the same rows.
+    """
+    batch_size = batch_size or _queue_setting('SMS_QUEUE_BATCH_SIZE', 50)
+    now = timezone.now()
+
+    with transaction.atomic():
+        ids = list(
+            OutboundSMS.objects.select_for_update(skip_locked=True)
+            .filter(status='PENDING', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        OutboundSMS.objects.filter(id__in=ids).update(
+            status='SENDING', attempts=F('attempts') + 1, next_attempt_at=now
+        )
+
+    return list(OutboundSMS.objects.filter(id__in=ids).order_by('id'))
+
+
+def _record_result(sms, result):
+    """Write the provider result back onto the queue row and its TithePayment"""
+    now = timezone.now()
+    success = bool(result.get('success'))
+
+    sms.provider = result.get('provider')
+    sms.provider_message_id = result.get('message_id')
+
+    if success:
+        sms.status = 'SENT'
+        sms.sent_at = now
+        sms.last_error = None
+    else:
+        sms.last_error = result.get('error') or 'Unknown error'
+        if sms.attempts >= sms.max_attempts:
+            sms.status = 'FAILED'
+        else:
+            sms.status = 'PENDING'
+            sms.next_attempt_at = now + retry_delay(sms.attempts)
+
+    sms.save(update_fields=[
+        'status', 'sent_at', 'last_error', 'next_attempt_at',
+        'provider', 'provider_message_id'
+    ])
+
+    if sms.tithe_payment_id:
+        # Queryset update() keeps post_save from firing again for the payment
+        payment_fields = {
+            'sms_sent': success,
+            'sms_sent_at': now,
+            'sms_message_id': sms.provider_message_id,
+            'last_sms_error': None if success else sms.last_error,
+        }
+        if not success:
+            payment_fields['sms_failure_count'] = F('sms_failure_count') + 1
+        TithePayment.objects.filter(pk=sms.tithe_payment_id).update(**payment_fields)
+
+    return success
+
+
+def process_batch(batch_size=None):
+    """
+    Deliver one batch of due messages.
+
+    Returns:
+        dict: Counts of claimed, sent and failed messages
+    """
+    batch = claim_batch(batch_size)
+    sent = failed = 0
+
+    # Provider calls run concurrently; results are written back on this thread
+    results = sms_service.send_many((sms.phone_number, sms.message) for sms in batch)
+
+    for sms, result in zip(batch, results):
+        if _record_result(sms, result):
+            sent += 1
+            logger.info("SMS QUEUE SUCCESS: %s via %s", sms.id, sms.provider)
+        else:
+            failed += 1
+            logger.warning("SMS QUEUE FAILURE: %s | Error: %s", sms.id, sms.last_error)
+
+    return {'claimed': len(batch), 'sent': sent, 'failed': failed}
+
+
+def release_stale(minutes=15):
+    """
+    Return messages stuck in SENDING (e.g. a killed worker) to the queue.
+    Claimed rows carry their claim time in next_attempt_at.
+    """
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    return OutboundSMS.objects.filter(
+        status='SENDING', next_attempt_at__lt=cutoff
+    ).update(status='PENDING', next_attempt_at=timezone.now())
@@ -0,0 +1,44 @@
+import calendar
+from datetime import date
+from decimal import Decimal
+from itertools import groupby
+from .models import TitheMemberMonthlyTotal
+
+
+def yearly_statements(year, member_ids=None):
+    """
+    Yield the giving statement of every member who paid tithe in `year`,
+    ordered by member name. Everything comes from the member-monthly rollup
+    in one query, however many members there are.
+
+    Each statement is a dict with `member`, `year`, `months` (twelve
+    entries of month/total/count, zero-filled), `total` and `payment_count`.
+    """
+    buckets = (
+        TitheMemberMonthlyTotal.objects
+        .filter(month__gte=date(year, 1, 1), month__lt=date(year + 1, 1, 1))
+        .select_related('name')
+        .order_by('name__name', 'name_id', 'month')
+    )
+    if member_ids:
+        buckets = buckets.filter(name_id__in=member_ids)
+
+    for _, rows in groupby(buckets.iterator(chunk_size=2000), key=lambda bucket: bucket.name_id):
+        rows = list(rows)
+        by_month = {row.month.month: row for row in rows}
+        months = [
+            {
+                'month': date(year, number, 1),
+                'name': calendar.month_name[number],
+                'total': by_month[number].total_amount if number in by_month else Decimal('0'),
+                'count': by_month[number].payment_count if number in by_month else 0,
+            }
+            for number in range(1, 13)
+        ]
+        yield {
+            'member': rows[0].name,
+            'year': year,
+            'months': months,
+            'total': sum(row.total_amount for row in rows),
+            'payment_count': sum(row.payment_count for row in rows),
+        }
@@ -1,3 +1,62 @@
+import json
+from decimal import Decimal
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from member.models import Member
+from .bulk import validate_rows
+from .models import TithePayment
+
+
+class BulkTitheValidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('bulk', 'bulk@example.com', 'password')
+        cls.member = Member.objects.create(name='John Doe', location='Sinza', new_believer_school=False)
+
+    def row(self, **fields):
+        return {'member_id': self.member.pk, 'amount': '1000', 'status': 'cash', **fields}
+
+    def test_non_finite_amounts_are_row_errors(self):
+        payments, errors = validate_rows([
+            self.row(),
+            self.row(amount='NaN'),
+            self.row(amount='Infinity'),
+            self.row(amount='-inf'),
+        ])
+        self.assertEqual(len(payments), 1)
+        self.assertEqual([number for number, _ in errors], [2, 3, 4])
+        self.assertTrue(all(error.startswith('Invalid amount') for _, error in errors))
+
+    def test_amounts_overflowing_the_field_are_row_errors(self):
+        payments, errors = validate_rows([
+            self.row(amount='99999999.99'),
+            self.row(amount='100000000'),
+            self.row(amount='99999999.999'),
+            self.row(amount='1e30'),
+        ])
+        self.assertEqual([payment.amount for payment in payments], [Decimal('99999999.99')])
+        self.assertEqual([number for number, _ in errors], [2, 3, 4])
+        self.assertTrue(all(error.startswith('Amount must be less than') for _, error in errors))
+
+    def test_non_string_dates_are_row_errors(self):
+        payments, errors = validate_rows([
+            self.row(date='2024-01-01'),
+            self.row(date=20240101),
+            self.row(date=['2024-01-01']),
+        ])
+        self.assertEqual(len(payments), 1)
+        self.assertEqual([number for number, _ in errors], [2, 3])
+        self.assertTrue(all(error.startswith('Invalid date') for _, error in errors))
+
+    def test_bulk_add_reports_bad_values_without_saving(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('tithepayment:bulk_add_tithe_payments'),
+            json.dumps({'payments': [self.row(), self.row(amount='NaN'), self.row(date=20240101)]}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['row'] for error in response.json()['errors']], [2, 3])
+        self.assertFalse(TithePayment.objects.exists())
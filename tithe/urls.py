@@ -17,17 +17,22 @@ urlpatterns = [
     path('search-members/', views.search_members, name='search_members'),
     path('get-member-details/<int:member_id>/', views.get_member_details, name='get_member_details'),
     path('quick-add/', views.quick_add_tithe_payment, name='quick_add_tithe_payment'),
+    path('bulk-add/', views.bulk_add_tithe_payments, name='bulk_add_tithe_payments'),
     path('export/', views.export_tithe_payments, name='export_tithe_payments'),
     path('reports/monthly/', views.MonthlyReportView.as_view(), name='monthly_report'),
     
     # Additional reports and analytics
     path('reports/yearly/', views.YearlyReportView.as_view(), name='yearly_report'),
     path('reports/member/<int:member_id>/', views.MemberTitheReportView.as_view(), name='member_report'),
+    path('reports/statements/<int:year>/', views.yearly_statements_view, name='yearly_statements'),
     path('analytics/dashboard/', views.TitheAnalyticsView.as_view(), name='analytics_dashboard'),
 
     # receipt 
     path('receipt/generate/<int:payment_id>/', views.generate_receipt, name='generate_receipt'),
     path('receipt/print/<int:receipt_id>/', views.print_receipt, name='print_receipt'),
+    path('receipt/document/<int:receipt_id>/', views.receipt_document, name='receipt_document'),
     path('receipt/list/', views.receipt_list, name='receipt_list'),
     path('receipt/auto-generate/<int:payment_id>/', views.auto_generate_receipt, name='auto_generate_receipt'),
+    path('receipt/batch/', views.batch_receipts, name='batch_receipts'),
+    path('receipt/batch/mark-printed/', views.mark_receipts_printed, name='mark_receipts_printed'),
 ]
\ No newline at end of file
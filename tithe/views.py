@@ -3,17 +3,73 @@ from django.urls import reverse_lazy, reverse
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q, Sum, Count, Avg
-from django.http import JsonResponse, HttpResponse
+from django.db.models import F, Q, Sum, Count
+from django.db.models.functions import TruncMonth, TruncYear
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, Http404
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from datetime import datetime, timedelta
 import csv
 import json
+import logging
 
-from .models import TithePayment, TitheReceipt
+from .models import TithePayment, TitheReceipt, TitheDailyTotal, TitheMemberMonthlyTotal, TitheMemberLedger
 from .forms import TithePaymentForm
+from christ_king_church.pagination import keyset_paginate
+from .statements import yearly_statements
+from . import receipts as receipt_batches
+from . import bulk as tithe_bulk
 from member.models import Member
+from member.search import autocomplete_members
+
+logger = logging.getLogger(__name__)
+
+RECEIPT_LIST_PAGE_SIZE = 50
+# Newest first, served by the (date, id) index
+PAYMENT_KEYSET_ORDERING = ('-date', '-pk')
+MEMBER_REPORT_RECENT_PAYMENTS = 50
+BULK_TITHE_MAX_ROWS = 1000
+
+
+def filter_tithe_payments(queryset, params):
+    """
+    Apply the tithe list filters (search, status, date range, member) from
+    request GET parameters. Shared by the list view and the CSV export.
+    """
+    # Search functionality - using 'name' field
+    search_query = params.get('search')
+    if search_query:
+        queryset = queryset.filter(
+            Q(name__name__icontains=search_query) |
+            Q(contact_number__icontains=search_query) |
+            Q(amount__icontains=search_query)
+        )
+    
+    # Filter by payment method
+    status_filter = params.get('status')
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+    
+    # Filter by date range
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    if start_date and end_date:
+        try:
+            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
+            queryset = queryset.between_days(start_date_obj, end_date_obj)
+        except ValueError:
+            pass
+    
+    # Filter by member
+    member_id = params.get('member')
+    if member_id:
+        queryset = queryset.filter(name_id=member_id)
+    
+    return queryset
 
 
 class TithePaymentListView(LoginRequiredMixin, ListView):
@@ -24,60 +80,59 @@ class TithePaymentListView(LoginRequiredMixin, ListView):
     ordering = ['-date']
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        
-        # Search functionality - using 'name' field
-        search_query = self.request.GET.get('search')
-        if search_query:
-            queryset = queryset.filter(
-                Q(name__name__icontains=search_query) |
-                Q(contact_number__icontains=search_query) |
-                Q(amount__icontains=search_query)
-            )
-        
-        # Filter by payment method
-        status_filter = self.request.GET.get('status')
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        # Filter by date range
-        start_date = self.request.GET.get('start_date')
-        end_date = self.request.GET.get('end_date')
-        if start_date and end_date:
-            try:
-                start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
-                end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(
-                    date__date__range=[start_date_obj, end_date_obj]
-                )
-            except ValueError:
-                pass
-        
-        # Filter by member
-        member_id = self.request.GET.get('member')
-        if member_id:
-            queryset = queryset.filter(name_id=member_id)
-        
-        return queryset
+        queryset = super().get_queryset().select_related('name')
+        return filter_tithe_payments(queryset, self.request.GET)
+
+    def use_keyset(self):
+        # Offset paging is kept for ?page= links and TITHE_LIST_PAGINATION='offset'
+        if 'page' in self.request.GET:
+            return False
+        return getattr(settings, 'TITHE_LIST_PAGINATION', 'keyset') == 'keyset'
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset():
+            return super().paginate_queryset(queryset, page_size)
+
+        page = keyset_paginate(
+            queryset, page_size, PAYMENT_KEYSET_ORDERING,
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
+        )
+        return None, page, page.object_list, page.has_other_pages()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
-        # Add summary statistics
-        queryset = self.get_queryset()
-        context['total_amount'] = queryset.aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        context['total_payments'] = queryset.count()
+        paginator = context['paginator']
+        
+        # Summary statistics in a single pass over the filtered payments;
+        # with offset paging the number of payments is the paginator's count
+        totals = {
+            'total': Sum('amount'),
+            'cash': Count('id', filter=Q(status='cash')),
+            'bank': Count('id', filter=Q(status='bank')),
+        }
+        if paginator is None:
+            totals['count'] = Count('id')
+        stats = self.object_list.order_by().aggregate(**totals)
+        context['total_amount'] = stats['total'] or 0
+        context['total_payments'] = paginator.count if paginator else stats['count']
         
         # Payment method counts
-        context['cash_payments'] = queryset.filter(status='cash').count()
-        context['bank_payments'] = queryset.filter(status='bank').count()
+        context['cash_payments'] = stats['cash']
+        context['bank_payments'] = stats['bank']
         
-        # Add filter options
-        context['members'] = Member.objects.all().order_by('name')
+        # Add filter options; members are looked up through search_members
         context['status_choices'] = TithePayment.PAYMENT_STATUS_CHOICES
+        member_id = self.request.GET.get('member')
+        if member_id:
+            context['selected_member'] = Member.objects.filter(pk=member_id).only('name').first()
+        
+        # Filters without the paging parameters, for building page links
+        query = self.request.GET.copy()
+        for key in ('page', 'after', 'before'):
+            query.pop(key, None)
+        context['filter_query'] = query.urlencode()
+        context['keyset'] = paginator is None
         
         # Preserve filter parameters
         context['current_filters'] = {
@@ -100,22 +155,21 @@ class TithePaymentDetailView(LoginRequiredMixin, DetailView):
     template_name = 'tithepayment/detail.html'
     context_object_name = 'payment'
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('name')
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
         # Add related payments from the same member
         context['related_payments'] = TithePayment.objects.filter(
-            name=self.object.name
+            name_id=self.object.name_id
         ).exclude(id=self.object.id).order_by('-date')[:10]
         
-        # Add member's total contributions
-        context['member_total_contributions'] = TithePayment.objects.filter(
-            name=self.object.name
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        context['member_payment_count'] = TithePayment.objects.filter(
-            name=self.object.name
-        ).count()
+        # Add member's total contributions from the maintained ledger
+        ledger = TitheMemberLedger.objects.filter(name_id=self.object.name_id).first()
+        context['member_total_contributions'] = ledger.total_amount if ledger else 0
+        context['member_payment_count'] = ledger.payment_count if ledger else 0
         
         # Active state for sidebar
         context['finance_active'] = True
@@ -234,62 +288,67 @@ class TithePaymentSummaryView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Overall statistics
-        payments = TithePayment.objects.all()
-        
-        context['total_collected'] = payments.aggregate(
-            total=Sum('amount')
-        )['total'] or 0
+        # Overall statistics, read from the daily rollup instead of every payment
+        daily = TitheDailyTotal.objects.all()
+        totals = daily.aggregate(total=Sum('total_amount'), count=Sum('payment_count'))
         
-        context['total_transactions'] = payments.count()
+        context['total_collected'] = totals['total'] or 0
+        context['total_transactions'] = totals['count'] or 0
         context['average_payment'] = context['total_collected'] / context['total_transactions'] if context['total_transactions'] > 0 else 0
         
         # Payments by status
-        context['payments_by_status'] = payments.values(
+        context['payments_by_status'] = daily.values(
             'status'
         ).annotate(
-            count=Count('id'),
-            total=Sum('amount')
+            count=Sum('payment_count'),
+            total=Sum('total_amount')
         ).order_by('-total')
         
         # Recent activity (last 30 days)
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        recent_payments = payments.filter(date__gte=thirty_days_ago)
-        
-        context['recent_total'] = recent_payments.aggregate(
-            total=Sum('amount')
-        )['total'] or 0
+        thirty_days_ago = timezone.localdate() - timedelta(days=30)
+        recent = daily.filter(day__gte=thirty_days_ago).aggregate(
+            total=Sum('total_amount'), count=Sum('payment_count')
+        )
         
-        context['recent_count'] = recent_payments.count()
+        context['recent_total'] = recent['total'] or 0
+        context['recent_count'] = recent['count'] or 0
         
         # Top contributors
-        context['top_contributors'] = payments.values(
+        context['top_contributors'] = TitheMemberMonthlyTotal.objects.values(
             'name__id', 'name__name'
         ).annotate(
-            total=Sum('amount'),
-            count=Count('id')
+            total=Sum('total_amount'),
+            count=Sum('payment_count')
         ).order_by('-total')[:10]
         
         # Recent payments
-        context['recent_payments'] = payments.order_by('-date')[:10]
-        
-        # Monthly breakdown (last 6 months)
-        monthly_data = []
-        for i in range(5, -1, -1):
-            month_start = timezone.now().replace(day=1) - timedelta(days=30*i)
-            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-            
-            month_payments = payments.filter(
-                date__date__range=[month_start.date(), month_end.date()]
-            )
-            
-            monthly_data.append({
-                'month': month_start.strftime('%b %Y'),
-                'total': month_payments.aggregate(total=Sum('amount'))['total'] or 0,
-                'count': month_payments.count()
-            })
+        context['recent_payments'] = TithePayment.objects.select_related('name').order_by('-date')[:10]
+        
+        # Monthly breakdown (last 6 months), one grouped query
+        months = []
+        month_start = timezone.localdate().replace(day=1)
+        for i in range(6):
+            months.insert(0, month_start)
+            month_start = (month_start - timedelta(days=1)).replace(day=1)
+        
+        monthly_totals = {
+            row['month']: row
+            for row in daily.filter(day__gte=months[0]).annotate(
+                month=TruncMonth('day')
+            ).values('month').annotate(
+                total=Sum('total_amount'),
+                count=Sum('payment_count')
+            ).order_by()
+        }
         
-        context['monthly_breakdown'] = monthly_data
+        context['monthly_breakdown'] = [
+            {
+                'month': month.strftime('%b %Y'),
+                'total': monthly_totals.get(month, {}).get('total') or 0,
+                'count': monthly_totals.get(month, {}).get('count') or 0
+            }
+            for month in months
+        ]
         
         # Active state for sidebar
         context['finance_active'] = True
@@ -299,27 +358,14 @@ class TithePaymentSummaryView(LoginRequiredMixin, TemplateView):
 
 @login_required
 def search_members(request):
-    """Search members by name or telephone"""
-    search_term = request.GET.get('search', '').strip()
+    """Autocomplete members by name or telephone for the tithe forms"""
+    search_term = (request.GET.get('q') or request.GET.get('search') or '').strip()
     
     if len(search_term) < 2:
         return JsonResponse({'members': []})
     
     try:
-        members = Member.objects.filter(
-            Q(name__icontains=search_term) | 
-            Q(telephone__icontains=search_term)
-        ).order_by('name')[:10]
-        
-        members_data = []
-        for member in members:
-            members_data.append({
-                'id': member.id,
-                'name': member.name,
-                'telephone': str(member.telephone) if member.telephone else '',
-            })
-        
-        return JsonResponse({'members': members_data})
+        return JsonResponse({'members': autocomplete_members(search_term)})
         
     except Exception as e:
         return JsonResponse({'error': str(e), 'members': []})
@@ -390,43 +436,85 @@ def quick_add_tithe_payment(request):
     return JsonResponse({'error': 'Invalid request'}, status=400)
 
 
+@login_required
+def bulk_add_tithe_payments(request):
+    """
+    Record many payments at once, e.g. the envelope count after a service.
+    Body: {"payments": [{"member_id", "amount", "payment_method", "date"}, ...]}.
+    Nothing is saved unless every row is valid.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request'}, status=400)
+    
+    try:
+        rows = json.loads(request.body).get('payments')
+    except (ValueError, AttributeError):
+        rows = None
+    if not isinstance(rows, list) or not rows:
+        return JsonResponse({'success': False, 'error': 'A list of payments is required'}, status=400)
+    if len(rows) > BULK_TITHE_MAX_ROWS:
+        return JsonResponse({
+            'success': False,
+            'error': f'At most {BULK_TITHE_MAX_ROWS} payments can be added at once'
+        }, status=400)
+    
+    # Anything but an object is passed through for validate_rows to report at its row number
+    rows = [
+        dict(row, status=row.get('payment_method', row.get('status'))) if isinstance(row, dict) else row
+        for row in rows
+    ]
+    payments, errors = tithe_bulk.validate_rows(rows)
+    if errors:
+        return JsonResponse({
+            'success': False,
+            'error': 'Some payments are invalid; nothing was saved',
+            'errors': [{'row': number, 'error': error} for number, error in errors]
+        }, status=400)
+    
+    payments = tithe_bulk.create_payments(payments)
+    return JsonResponse({
+        'success': True,
+        'message': f'{len(payments)} tithe payments added successfully!',
+        'payment_ids': [payment.id for payment in payments],
+        'total_amount': str(sum(payment.amount for payment in payments))
+    })
+
+
+class Echo:
+    """Pseudo-buffer for csv.writer: write() returns the line instead of storing it"""
+    def write(self, value):
+        return value
+
+
 def export_tithe_payments(request):
     if not request.user.is_authenticated:
         messages.error(request, 'Authentication required')
         return redirect('tithepayment:tithepayment_list')
     
     try:
-        # Get filtered queryset
-        queryset = TithePayment.objects.all().order_by('-date')
-        
         # Apply same filters as list view
-        search_query = request.GET.get('search')
-        if search_query:
-            queryset = queryset.filter(
-                Q(name__name__icontains=search_query) |
-                Q(contact_number__icontains=search_query)
-            )
-        
-        status_filter = request.GET.get('status')
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        # Create HTTP response
-        response = HttpResponse(content_type='text/csv')
+        queryset = filter_tithe_payments(
+            TithePayment.objects.order_by('-date'), request.GET
+        ).values_list('date', 'name__name', 'contact_number', 'amount', 'status')
+        
+        status_labels = dict(TithePayment.PAYMENT_STATUS_CHOICES)
+        writer = csv.writer(Echo())
+        
+        def rows():
+            yield writer.writerow(['Date', 'Member Name', 'Contact Number', 'Amount', 'Payment Method'])
+            # Stream rows straight from a server-side cursor; nothing is
+            # held in memory beyond one chunk
+            for date, member_name, contact_number, amount, status in queryset.iterator(chunk_size=2000):
+                yield writer.writerow([
+                    date.strftime('%Y-%m-%d %H:%M'),
+                    member_name,
+                    contact_number,
+                    amount,
+                    status_labels.get(status, status)
+                ])
+        
+        response = StreamingHttpResponse(rows(), content_type='text/csv')
         response['Content-Disposition'] = 'attachment; filename="tithe_payments.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Date', 'Member Name', 'Contact Number', 'Amount', 'Payment Method'])
-        
-        for payment in queryset:
-            writer.writerow([
-                payment.date.strftime('%Y-%m-%d %H:%M'),
-                payment.name.name,
-                payment.contact_number,
-                payment.amount,
-                payment.get_status_display()
-            ])
-        
         return response
         
     except Exception as e:
@@ -439,14 +527,12 @@ class MonthlyReportView(LoginRequiredMixin, ListView):
     context_object_name = 'monthly_data'
 
     def get_queryset(self):
-        # Get payments grouped by month
-        from django.db.models.functions import TruncMonth
-        
-        monthly_data = TithePayment.objects.annotate(
-            month=TruncMonth('date')
+        # Get payments grouped by month, from the daily rollup
+        monthly_data = TitheDailyTotal.objects.annotate(
+            month=TruncMonth('day')
         ).values('month').annotate(
-            total_amount=Sum('amount'),
-            payment_count=Count('id')
+            total_amount=Sum('total_amount'),
+            payment_count=Sum('payment_count')
         ).order_by('-month')
         
         return monthly_data
@@ -473,14 +559,12 @@ class YearlyReportView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get yearly data
-        from django.db.models.functions import TruncYear
-        
-        yearly_data = TithePayment.objects.annotate(
-            year=TruncYear('date')
+        # Get yearly data from the daily rollup
+        yearly_data = TitheDailyTotal.objects.annotate(
+            year=TruncYear('day')
         ).values('year').annotate(
-            total_amount=Sum('amount'),
-            payment_count=Count('id')
+            total_amount=Sum('total_amount'),
+            payment_count=Sum('payment_count')
         ).order_by('-year')
         
         context['yearly_data'] = yearly_data
@@ -496,29 +580,24 @@ class MemberTitheReportView(LoginRequiredMixin, DetailView):
     model = Member
     template_name = 'tithepayment/member_report.html'
     context_object_name = 'member'
+    pk_url_kwarg = 'member_id'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get all tithe payments for this member
-        member_payments = TithePayment.objects.filter(
+        # Recent payments only; totals and months come from the rollups
+        context['member_payments'] = TithePayment.objects.filter(
             name=self.object
-        ).order_by('-date')
+        ).order_by('-date')[:MEMBER_REPORT_RECENT_PAYMENTS]
         
-        context['member_payments'] = member_payments
-        context['total_contributions'] = member_payments.aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        context['payment_count'] = member_payments.count()
+        ledger = TitheMemberLedger.objects.filter(name=self.object).first()
+        context['ledger'] = ledger
+        context['total_contributions'] = ledger.total_amount if ledger else 0
+        context['payment_count'] = ledger.payment_count if ledger else 0
         
         # Monthly breakdown for this member
-        from django.db.models.functions import TruncMonth
-        
-        monthly_breakdown = member_payments.annotate(
-            month=TruncMonth('date')
-        ).values('month').annotate(
-            monthly_total=Sum('amount'),
-            payment_count=Count('id')
+        monthly_breakdown = self.object.tithe_monthly_totals.values(
+            'month', 'payment_count', monthly_total=F('total_amount')
         ).order_by('-month')
         
         context['monthly_breakdown'] = monthly_breakdown
@@ -530,32 +609,43 @@ class MemberTitheReportView(LoginRequiredMixin, DetailView):
         return context
 
 
+@login_required
+def yearly_statements_view(request, year):
+    """Printable giving statements for every member (or ?member=<id>) for a year"""
+    member_ids = [int(pk) for pk in request.GET.getlist('member') if pk.isdigit()]
+    context = {
+        "statements": list(yearly_statements(year, member_ids)),
+        "year": year,
+    }
+    return render(request, "tithepayment/yearly_statements.html", context)
+
+
 class TitheAnalyticsView(LoginRequiredMixin, TemplateView):
     template_name = 'tithepayment/analytics_dashboard.html'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        payments = TithePayment.objects.all()
+        daily = TitheDailyTotal.objects.all()
         
         # Basic stats
-        context['total_collected'] = payments.aggregate(total=Sum('amount'))['total'] or 0
-        context['total_payments'] = payments.count()
-        context['average_payment'] = payments.aggregate(avg=Avg('amount'))['avg'] or 0
+        totals = daily.aggregate(total=Sum('total_amount'), count=Sum('payment_count'))
+        context['total_collected'] = totals['total'] or 0
+        context['total_payments'] = totals['count'] or 0
+        context['average_payment'] = context['total_collected'] / context['total_payments'] if context['total_payments'] else 0
         
         # Growth metrics (last 30 days vs previous 30 days)
-        today = timezone.now().date()
+        today = timezone.localdate()
         last_30_start = today - timedelta(days=30)
         previous_30_start = last_30_start - timedelta(days=30)
         
-        last_30_payments = payments.filter(date__date__gte=last_30_start)
-        previous_30_payments = payments.filter(
-            date__date__gte=previous_30_start, 
-            date__date__lt=last_30_start
-        )
-        
-        last_30_total = last_30_payments.aggregate(total=Sum('amount'))['total'] or 0
-        previous_30_total = previous_30_payments.aggregate(total=Sum('amount'))['total'] or 0
+        last_30_total = daily.filter(
+            day__gte=last_30_start
+        ).aggregate(total=Sum('total_amount'))['total'] or 0
+        previous_30_total = daily.filter(
+            day__gte=previous_30_start, 
+            day__lt=last_30_start
+        ).aggregate(total=Sum('total_amount'))['total'] or 0
         
         context['growth_percentage'] = (
             ((last_30_total - previous_30_total) / previous_30_total * 100) 
@@ -593,15 +683,12 @@ def generate_receipt(request, payment_id):
 
 @login_required
 def print_receipt(request, receipt_id):
-    receipt = get_object_or_404(TitheReceipt, id=receipt_id)
+    receipt = get_object_or_404(TitheReceipt.objects.select_related('tithe_payment__name'), id=receipt_id)
     
     if request.method == "POST":
         try:
-            # Your printing logic here
-            print_data = receipt.get_print_data()
-            
             # Simulate printing (replace with actual printer code)
-            print(f"Printing receipt: {receipt.receipt_number}")
+            logger.info("Printing receipt %s", receipt.receipt_number)
             
             # Mark as printed
             receipt.mark_printed()
@@ -622,49 +709,132 @@ def print_receipt(request, receipt_id):
     context = {
         "receipt": receipt,
         "payment": receipt.tithe_payment,
-        "print_data": receipt.get_print_data(),
     }
     return render(request, "tithepayment/print_receipt.html", context)
 
+@login_required
+def receipt_document(request, receipt_id):
+    """
+    Printable receipt served from the render cache. ETag and Last-Modified
+    let a reprint be answered with 304 Not Modified.
+    """
+    receipt_number = get_object_or_404(
+        TitheReceipt.objects.values_list('receipt_number', flat=True), id=receipt_id
+    )
+    document = receipt_batches.get_receipt_document(receipt_number)
+    if document is None:
+        raise Http404("Receipt not found")
+    
+    response = get_conditional_response(
+        request, etag=document['etag'], last_modified=document['last_modified']
+    )
+    if response is None:
+        response = HttpResponse(document['content'])
+    response['ETag'] = document['etag']
+    response['Last-Modified'] = http_date(document['last_modified'])
+    # Always revalidate so an edited payment is never printed from a stale copy
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
 @login_required
 def receipt_list(request):
     """List all tithe payments with receipt status"""
     template = "tithepayment/receipt_list.html"
     
+    receipt_counts = TitheReceipt.objects.aggregate(
+        total=Count('id'),
+        unprinted=Count('id', filter=Q(is_printed=False)),
+    )
+    
     # Handle AJAX count requests
     if request.GET.get('ajax_counts') or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        unprinted_count = TitheReceipt.objects.filter(is_printed=False).count()
         return JsonResponse({
-            'unprinted_count': unprinted_count,
-            'total_receipts': TitheReceipt.objects.count()
+            'unprinted_count': receipt_counts['unprinted'],
+            'total_receipts': receipt_counts['total']
         })
     
-    payments = TithePayment.objects.all().order_by('-date')
+    # The receipt is joined in, so the page renders in one query
+    payments = TithePayment.objects.select_related('name', 'receipt')
     
     # Check if we should show only unprinted receipts
     show_unprinted = request.GET.get('show_unprinted')
     if show_unprinted:
         payments = payments.filter(receipt__is_printed=False)
     
+    page = keyset_paginate(
+        payments, RECEIPT_LIST_PAGE_SIZE, PAYMENT_KEYSET_ORDERING,
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+    
     # Add receipt information to each payment
-    for payment in payments:
+    for payment in page:
         payment.has_receipt = hasattr(payment, 'receipt')
         if payment.has_receipt:
             payment.receipt_data = payment.receipt
     
-    # Calculate counts
-    unprinted_count = TitheReceipt.objects.filter(is_printed=False).count()
-    total_receipts = TitheReceipt.objects.count()
-    
     context = {
-        "payments": payments,
+        "payments": page,
+        "page_obj": page,
         "receipts_active": "active",
-        "unprinted_count": unprinted_count,
-        "total_receipts": total_receipts,
+        "unprinted_count": receipt_counts['unprinted'],
+        "total_receipts": receipt_counts['total'],
         "show_unprinted": bool(show_unprinted),
     }
     return render(request, template, context)
 
+@login_required
+def batch_receipts(request):
+    """
+    Generate the missing receipts for a selection of payments and render
+    them all as one print-ready document, one receipt per page.
+    """
+    if request.method != "POST":
+        return redirect('tithepayment:receipt_list')
+    
+    try:
+        start_day = datetime.strptime(request.POST.get('start_date', ''), '%Y-%m-%d').date()
+        end_day = datetime.strptime(request.POST.get('end_date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        start_day = end_day = None
+    member_id = request.POST.get('member') or None
+    
+    if not (start_day and end_day) and not member_id:
+        messages.error(request, "Choose a date range or a member to print receipts for.")
+        return redirect('tithepayment:receipt_list')
+    
+    payments = receipt_batches.select_payments(
+        start_day, end_day, member_id,
+        unprinted_only=not request.POST.get('include_printed'),
+    )
+    created = receipt_batches.create_missing_receipts(payments, generated_by=request.user.username)
+    receipts = list(receipt_batches.receipts_for(payments))
+    
+    context = {
+        "receipts": receipts,
+        "created_count": created,
+        "receipt_ids": [receipt.id for receipt in receipts],
+    }
+    return render(request, "tithepayment/batch_receipts.html", context)
+
+@login_required
+def mark_receipts_printed(request):
+    """Mark the receipts of a printed batch in one UPDATE"""
+    if request.method != "POST":
+        return JsonResponse({'success': False, 'message': 'POST required'}, status=405)
+    
+    try:
+        receipt_ids = [int(pk) for pk in json.loads(request.body).get('receipt_ids', [])]
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({'success': False, 'message': 'Invalid receipt list'}, status=400)
+    
+    updated = receipt_batches.mark_printed(receipt_ids)
+    return JsonResponse({
+        'success': True,
+        'message': f'{updated} receipt(s) marked as printed',
+        'updated': updated
+    })
+
 @login_required
 def auto_generate_receipt(request, payment_id):
     """Auto-generate receipt after payment save"""